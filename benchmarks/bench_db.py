@@ -0,0 +1,194 @@
+"""Benchmark the ExpenseDBHelper hot paths at realistic data sizes.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_db.py --sizes 10k,1M --output bench_db.json
+    python benchmarks/bench_db.py --sizes 10k,1M --compare bench_db.json
+
+Generated databases are cached in benchmarks/.data and copied before each
+run, so the write benchmarks never change the cached data. Results are
+written as JSON; with --compare the run fails (exit code 1) when any
+operation's median got slower than --threshold times the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from datagen import cached_database
+
+from db_helper import ExpenseDBHelper
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.data')
+
+# get_all_entries materializes every row; above this it only measures swap
+FULL_LOAD_LIMIT = 1000000
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    multiplier = {'k': 1000, 'm': 1000000}.get(text[-1], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+
+def time_call(func, repeat):
+    """Run func repeat times and return the timings in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    return {
+        "min_ms": round(ordered[0], 3),
+        "median_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "repeat": len(ordered),
+    }
+
+
+def operations(db, rows, rng):
+    """Return (name, callable, repeat scale) for every benchmarked call."""
+    max_id = db.conn.execute("SELECT MAX(id) FROM entries").fetchone()[0] or 1
+
+    def add():
+        db.add_entry({"date": "2024-06-15", "type": "Expense", "category": "Food", "amount": 1250, "note": "bench"})
+
+    def update():
+        db.update_entry(rng.randint(1, max_id), {"date": "2023-03-03", "type": "Expense",
+                                                  "category": "Transport", "amount": 725, "note": "bench"})
+
+    def uncached(func):
+        # Filtered reads are cached per connection; measure the query itself
+        def run():
+            db.invalidate_cache()
+            return func()
+        return run
+
+    ops = [
+        ("get_totals", db.get_totals, 1),
+        ("get_all_categories", db.get_all_categories, 1),
+        ("get_filtered_entries month+category+type",
+         uncached(lambda: db.get_filtered_entries("2020-03-01", "2020-03-31", "Food", "Expense")), 1),
+        ("get_filtered_entries year",
+         uncached(lambda: db.get_filtered_entries("2020-01-01", "2020-12-31")), 1),
+        ("get_filtered_entries year cached",
+         lambda: db.get_filtered_entries("2020-01-01", "2020-12-31"), 1),
+        ("get_filtered_entries year other",
+         uncached(lambda: db.get_filtered_entries("2020-01-01", "2020-12-31", "Other")), 1),
+        ("get_filtered_totals month+category",
+         uncached(lambda: db.get_filtered_totals("2020-03-01", "2020-03-31", "Food")), 1),
+        ("get_filtered_totals year",
+         uncached(lambda: db.get_filtered_totals("2020-01-01", "2020-12-31")), 1),
+        ("get_filtered_totals all time",
+         uncached(lambda: db.get_filtered_totals("2000-01-01", "2030-12-31")), 1),
+        ("get_entries_page first", lambda: db.get_entries_page(50), 1),
+        ("get_entries_page last", lambda: db.get_entries_page(50, from_oldest=True), 1),
+        ("search top 5000",
+         uncached(lambda: db.get_filtered_entries(search="coff", limit=5000)), 1),
+        ("search year+type",
+         uncached(lambda: db.get_filtered_entries("2020-01-01", "2020-12-31", entry_type="Expense",
+                                                  search="gift", limit=5000)), 1),
+        ("search totals", uncached(lambda: db.get_filtered_totals(search="refund")), 1),
+        ("add_entry", add, 5),
+        ("update_entry", update, 5),
+    ]
+    if rows <= FULL_LOAD_LIMIT:
+        ops.insert(0, ("get_all_entries", uncached(db.get_all_entries), 1))
+    return ops
+
+
+def run_size(rows, repeat, seed):
+    source = cached_database(DATA_DIR, rows, seed)
+    results = []
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, "bench.db")
+        shutil.copyfile(source, path)
+        with ExpenseDBHelper(path) as db:
+            rng = random.Random(seed)
+            for name, func, scale in operations(db, rows, rng):
+                func()  # warm up caches and prepared statements
+                result = {"rows": rows, "op": name}
+                result.update(summarize(time_call(func, repeat * scale)))
+                results.append(result)
+                print(f"{rows:>10,}  {name:<45} median {result['median_ms']:>10.3f} ms", file=sys.stderr)
+
+            offenders = db.check_query_plans()
+            results.append({"rows": rows, "op": "check_query_plans", "full_scans": len(offenders)})
+            for query, step in offenders:
+                print(f"{rows:>10,}  full scan: {query}", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    """Return the operations whose median regressed beyond threshold."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(r["rows"], r["op"]): r for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        old = baseline.get((result["rows"], result["op"]))
+        if old is None:
+            continue
+        if "median_ms" in result and result["median_ms"] > old["median_ms"] * threshold:
+            regressions.append(f"{result['rows']:,} rows {result['op']}: "
+                               f"{old['median_ms']:.3f} ms -> {result['median_ms']:.3f} ms")
+        if result.get("full_scans", 0) > old.get("full_scans", 0):
+            regressions.append(f"{result['rows']:,} rows: new full table scans in hot queries")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10k,1M", help="comma separated row counts, e.g. 10k,1M,10M")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per operation")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="allowed slowdown factor against the baseline median")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes.split(","):
+        results.extend(run_size(parse_size(size), args.repeat, args.seed))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Benchmark how fast the app starts, using python -X importtime.
+
+Usage (from the repository root):
+
+    python benchmarks/bench_startup.py --output bench_startup.json
+    python benchmarks/bench_startup.py --compare bench_startup.json
+    xvfb-run python benchmarks/bench_startup.py --window
+
+Every run starts a fresh interpreter that imports main_window, the module
+behind src/ui/ui.py, and reads its cumulative import time from the
+-X importtime report. The slowest imports of the median run are printed.
+Modules the UI only loads on first use (tkcalendar, the forms, csv,
+matplotlib, ...) must not show up at all; the run fails if one does, as
+it does with --compare when the median got slower than --threshold
+times the baseline.
+
+With --window (needs a display) each run also opens a MainWindow on an
+empty database and times it until the window is mapped and drawn.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import tkinter
+from datetime import datetime
+
+from bench_db import compare, summarize
+
+UI_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'ui')
+
+# Imported on first use, after the window is on screen
+DEFERRED_MODULES = ('tkcalendar', 'babel', 'ui_forms', 'csv_io', 'csv', 'charts', 'matplotlib', 'numpy',
+                    'analytics', 'concurrent.futures')
+
+# Slowest imports (by their own time) printed per run
+TOP_IMPORTS = 10
+
+FIRST_PAINT = '''
+import sys, time
+start = time.perf_counter()
+import main_window
+from db_helper import ExpenseDBHelper
+main_window.db = ExpenseDBHelper(sys.argv[1])
+app = main_window.MainWindow()
+app.wait_visibility()
+app.update_idletasks()
+print((time.perf_counter() - start) * 1000)
+app.on_close()
+'''
+
+
+def import_profile():
+    """Import main_window in a fresh interpreter; return {module: (self us, cumulative us)}."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main_window'],
+                            cwd=UI_DIR, capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(own), int(cumulative))
+    return modules
+
+
+def first_paint_ms(scratch):
+    """Start the app in a fresh interpreter and return the milliseconds until its window is drawn."""
+    path = os.path.join(scratch, 'startup.db')
+    result = subprocess.run([sys.executable, '-c', FIRST_PAINT, path],
+                            cwd=UI_DIR, capture_output=True, text=True, check=True)
+    return float(result.stdout.split()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10, help="interpreter starts per measurement")
+    parser.add_argument("--window", action="store_true", help="also time the first paint (needs a display)")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="allowed slowdown factor against the baseline median")
+    args = parser.parse_args(argv)
+
+    profiles = [import_profile() for _ in range(args.repeat)]
+    timings = [profile['main_window'][1] / 1000 for profile in profiles]
+    median = profiles[timings.index(sorted(timings)[len(timings) // 2])]
+    for name, (own, cumulative) in sorted(median.items(), key=lambda item: -item[1][0])[:TOP_IMPORTS]:
+        print(f"{name:<40} self {own / 1000:>7.2f} ms  cumulative {cumulative / 1000:>7.2f} ms", file=sys.stderr)
+
+    eager = sorted({name for profile in profiles for name in profile
+                    if name.split('.')[0] in DEFERRED_MODULES or name in DEFERRED_MODULES})
+    result = {"rows": 0, "op": "import main_window", "modules": len(median), "eager_imports": eager}
+    result.update(summarize(timings))
+    results = [result]
+    print(f"import main_window  median {result['median_ms']:.1f} ms  ({len(median)} modules)", file=sys.stderr)
+
+    if args.window:
+        try:
+            tkinter.Tk().destroy()
+        except tkinter.TclError as e:
+            print(f"Cannot open a Tk window ({e}); run under a display or xvfb-run.", file=sys.stderr)
+            return 2
+        with tempfile.TemporaryDirectory() as scratch:
+            paints = [first_paint_ms(scratch) for _ in range(args.repeat)]
+        result = {"rows": 0, "op": "first paint"}
+        result.update(summarize(paints))
+        results.append(result)
+        print(f"first paint         median {statistics.median(paints):.1f} ms", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "tk": tkinter.TkVersion,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    failures = [f"imported at startup: {name}" for name in eager]
+    if args.compare:
+        failures += compare(results, args.compare, args.threshold)
+    for line in failures:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
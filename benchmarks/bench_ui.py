@@ -0,0 +1,357 @@
+"""Benchmark the Tk refresh paths of MainWindow and EntryTable.
+
+Usage (from the repository root; needs a display, e.g. Xvfb):
+
+    xvfb-run python benchmarks/bench_ui.py --sizes 1k,5k,50k --output bench_ui.json
+    xvfb-run python benchmarks/bench_ui.py --sizes 1k,5k,50k --compare bench_ui.json
+
+A real MainWindow is opened on a copy of a generated database (see
+datagen.py). Each operation is timed end to end, from the user action until
+the result is on screen, including the QueryWorker hand-off. Where it helps
+to see where the time goes, the same work is also timed phase by phase:
+the SQLite query, formatting rows for display and the Treeview calls.
+
+The window is withdrawn unless --visible is given. A withdrawn Treeview
+still does all its item bookkeeping but is never drawn, and in virtual
+mode it shows a single row.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tkinter
+from datetime import date, datetime
+from functools import partial
+
+from bench_db import DATA_DIR, compare, parse_size, summarize
+from datagen import cached_database
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src', 'ui'))
+
+import db_helper
+import main_window
+from csv_io import export_entries
+from db_helper import ExpenseDBHelper
+
+# Give up on an operation that has not finished after this many seconds
+SETTLE_TIMEOUT = 600
+
+
+def settle(app, done=None):
+    """Process Tk events until no background query (and done(), if given) is outstanding."""
+    deadline = time.perf_counter() + SETTLE_TIMEOUT
+    while app.queries.latest or (done is not None and not done()):
+        if time.perf_counter() > deadline:
+            raise RuntimeError("timed out waiting for the UI to settle")
+        app.update()
+    app.update_idletasks()
+
+
+def timed(app, action, done=None):
+    """Run action() and return the milliseconds until the UI has settled."""
+    start = time.perf_counter()
+    action()
+    settle(app, done)
+    return (time.perf_counter() - start) * 1000
+
+
+def stopwatch(func, *args, **kwargs):
+    """Return (result, milliseconds) of one call."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+class Recorder:
+    """Collects the wall time and phase timings of every operation."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.timings = {}   # op -> {"wall": [...], phase: [...]}
+
+    def add(self, op, wall, **phases):
+        timings = self.timings.setdefault(op, {"wall": []})
+        timings["wall"].append(wall)
+        for phase, ms in phases.items():
+            timings.setdefault(phase, []).append(ms)
+
+    def results(self):
+        results = []
+        for op, timings in self.timings.items():
+            result = {"rows": self.rows, "op": op}
+            result.update(summarize(timings.pop("wall")))
+            result["phases"] = {phase: summarize(values) for phase, values in timings.items()}
+            results.append(result)
+            phases = "  ".join(f"{phase} {summary['median_ms']:.1f}" for phase, summary in result["phases"].items())
+            print(f"{self.rows:>10,}  {op:<22} median {result['median_ms']:>10.1f} ms  {phases}", file=sys.stderr)
+        return results
+
+
+def open_app(path, visible):
+    """Open a MainWindow whose shared connection uses the database at path."""
+    db_helper.db.close()
+    db_helper.db = ExpenseDBHelper(path)
+    main_window.db = db_helper.db  # main_window keeps its own reference
+
+    app = main_window.MainWindow()
+    if not visible:
+        app.withdraw()
+    # Let the initial after(100) loads run before measuring anything
+    deadline = time.perf_counter() + 0.2
+    while time.perf_counter() < deadline:
+        app.update()
+    settle(app)
+    return app
+
+
+def table_phases(app, reader, load, fetch_page):
+    """Time load(reader) and the display of its result, phase by phase.
+
+    Mirrors what refresh_data/apply_filters do on the worker thread and in
+    show_entries, starting from an empty table.
+    """
+    table = app.entry_table
+    table.clear_table()
+    app.update_idletasks()
+
+    (totals, entries), query_ms = stopwatch(load, reader)
+    if entries is None:
+        # Virtual mode: only the visible page is fetched and formatted
+        _, render_ms = stopwatch(table.load_virtual, totals[3], fetch_page)
+        app.update_idletasks()
+        return {"query": query_ms, "render": render_ms}
+
+    _, format_ms = stopwatch(lambda: [table.format_entry(entry) for entry in entries])
+    _, display_ms = stopwatch(table.add_entry, entries)
+    app.update_idletasks()
+    return {"query": query_ms, "format": format_ms, "insert": display_ms - format_ms}
+
+
+def bench_initial_load(app, reader, recorder, repeat):
+    def load(worker_db):
+        with worker_db.snapshot():
+            totals = worker_db.get_totals()
+            entries = worker_db.get_all_entries() if totals[3] <= main_window.VIRTUAL_THRESHOLD else None
+        return totals, entries
+
+    for _ in range(repeat):
+        # Start from an empty plain table, like the first refresh after startup
+        app.entry_table.clear_table()
+        app.entry_table.set_virtual(False)
+        app.update_idletasks()
+        wall = timed(app, app.refresh_data)
+        recorder.add("initial load", wall, **table_phases(app, reader, load, reader.get_entries_page))
+
+
+def bench_first_page(app, recorder, repeat):
+    """Startup load: wall time until the newest page is shown, and until all history has streamed in."""
+    table = app.entry_table
+    for _ in range(repeat):
+        table.clear_table()
+        table.set_virtual(False)
+        app.update_idletasks()
+        start = time.perf_counter()
+        app.load_first_page()
+        # Not settle(): the stream keeps the worker busy after the first page
+        while not (table.item_order or table.virtual):
+            if time.perf_counter() - start > SETTLE_TIMEOUT:
+                raise RuntimeError("timed out waiting for the first page")
+            app.update()
+        app.update_idletasks()
+        first_page = (time.perf_counter() - start) * 1000
+        settle(app, done=lambda: app.stream_after is None)
+        recorder.add("first page", first_page, all_history=(time.perf_counter() - start) * 1000)
+
+
+def bench_apply_filters(app, reader, recorder, repeat):
+    filters = dict(from_date="2020-01-01", to_date="2020-12-31", category="All", entry_type="Expense")
+
+    def load(worker_db):
+        with worker_db.snapshot():
+            totals = worker_db.get_filtered_totals(**filters)
+            entries = None
+            if totals[3] <= main_window.VIRTUAL_THRESHOLD:
+                entries = worker_db.get_filtered_entries(**filters)
+        return totals, entries
+
+    for _ in range(repeat):
+        settle(app)
+        timed(app, app.refresh_data)  # back to the unfiltered view (not measured)
+        app.from_date_entry.set_date(date(2020, 1, 1))
+        app.to_date_entry.set_date(date(2020, 12, 31))
+        app.category_filter.set(filters["category"])
+        app.type_filter.set(filters["entry_type"])
+        wall = timed(app, app.apply_filters)
+        fetch_page = partial(reader.get_entries_page, **filters)
+        recorder.add("apply filters", wall, **table_phases(app, reader, load, fetch_page))
+
+
+def bench_live_filter(app, recorder, repeat):
+    """Type a search one key at a time; each keystroke is timed until its rows are on screen.
+
+    Keystrokes that can narrow the rows already shown paint at once;
+    the others wait for the debounced query.
+    """
+    def wait_for_query():
+        # The debounced query has been sent once filter_after is cleared
+        settle(app, done=lambda: app.filter_after is None)
+
+    for _ in range(repeat):
+        app.clear_filters()
+        settle(app)
+        app.type_filter.set("Expense")
+        app.on_filter_change()
+        wait_for_query()
+        for key in "coffee":
+            shown = app.shown
+            wall = timed(app, lambda: app.search_entry.insert("end", key), done=lambda: app.shown is not shown)
+            recorder.add("search keystroke", wall)
+        wait_for_query()
+    app.clear_filters()
+    settle(app)
+
+
+def refresh_after_write(app, write):
+    """Do what the add/edit/delete handlers do once their dialog has closed.
+
+    The category combobox is updated by the helper's category listener
+    during the write itself, so it is part of what gets measured.
+    """
+    _, write_ms = stopwatch(write)
+    app.refresh_data()
+    return write_ms
+
+
+def bench_writes(app, recorder, repeat, rng):
+    timed(app, app.refresh_data)
+    db = db_helper.db
+    max_id = db.conn.execute("SELECT MAX(id) FROM entries").fetchone()[0] or 1
+    added = []
+
+    for i in range(repeat):
+        entry = {"date": "2024-06-15", "type": "Expense", "category": "Food", "amount": 1250 + i, "note": "bench"}
+        phases = {}
+        wall = timed(app, lambda: phases.update(write=refresh_after_write(
+            app, lambda: added.append(db.add_entry(entry)))))
+        recorder.add("add + refresh", wall, **phases)
+
+    for i in range(repeat):
+        entry_id = rng.randint(1, max_id)
+        entry = {"date": "2023-03-03", "type": "Expense", "category": "Transport", "amount": 725 + i, "note": "bench"}
+        phases = {}
+        wall = timed(app, lambda: phases.update(write=refresh_after_write(
+            app, lambda: db.update_entry(entry_id, entry))))
+        recorder.add("edit + refresh", wall, **phases)
+
+    for entry_id in added:
+        phases = {}
+        wall = timed(app, lambda: phases.update(write=refresh_after_write(
+            app, lambda: db.delete_entry(entry_id))))
+        recorder.add("delete + refresh", wall, **phases)
+
+
+def bench_categories(app, reader, recorder, repeat):
+    for _ in range(repeat):
+        wall = timed(app, app.refresh_categories)
+        categories, query_ms = stopwatch(reader.get_all_categories)
+        _, combobox_ms = stopwatch(app.show_categories, categories)
+        recorder.add("refresh categories", wall, query=query_ms, combobox=combobox_ms)
+
+
+def bench_export(app, reader, recorder, repeat, scratch):
+    path = os.path.join(scratch, "export.csv")
+    for _ in range(repeat):
+        finished = []
+
+        def work(task_db, progress):
+            return export_entries(task_db, path)
+
+        wall = timed(app, lambda: app.run_file_task(app.export_button, work,
+                                                    lambda result, error: finished.append(error)),
+                     done=lambda: finished)
+        if finished[0] is not None:
+            raise finished[0]
+        _, export_ms = stopwatch(export_entries, reader, path)
+        recorder.add("export", wall, export_entries=export_ms)
+
+
+def run_size(rows, repeat, seed, visible):
+    source = cached_database(DATA_DIR, rows, seed)
+    recorder = Recorder(rows)
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, "bench.db")
+        shutil.copyfile(source, path)
+        app = open_app(path, visible)
+        try:
+            # Stands in for the QueryWorker connection when timing phases
+            with ExpenseDBHelper(path) as reader:
+                bench_initial_load(app, reader, recorder, repeat)
+                bench_first_page(app, recorder, repeat)
+                bench_apply_filters(app, reader, recorder, repeat)
+                bench_live_filter(app, recorder, repeat)
+                bench_writes(app, recorder, repeat, random.Random(seed))
+                bench_categories(app, reader, recorder, repeat)
+                bench_export(app, reader, recorder, repeat, scratch)
+        finally:
+            app.on_close()
+    return recorder.results()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1k,5k,50k", help="comma separated row counts, e.g. 1k,5k,50k")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per operation")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--visible", action="store_true", help="keep the window mapped while measuring")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="allowed slowdown factor against the baseline median")
+    args = parser.parse_args(argv)
+
+    try:
+        tkinter.Tk().destroy()
+    except tkinter.TclError as e:
+        print(f"Cannot open a Tk window ({e}); run under a display or xvfb-run.", file=sys.stderr)
+        return 2
+
+    results = []
+    for size in args.sizes.split(","):
+        results.extend(run_size(parse_size(size), args.repeat, args.seed, args.visible))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "tk": tkinter.TkVersion,
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "visible": args.visible,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
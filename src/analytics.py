@@ -0,0 +1,196 @@
+"""Vectorized analytics over a columnar NumPy snapshot of the entries table.
+
+EntryColumns loads every entry once into parallel arrays and afterwards
+only appends rows added since the last refresh; an update or delete of an
+existing entry (see the entry_revision counter) triggers a full reload.
+All breakdowns work on the arrays with NumPy, never row by row.
+
+Amounts are int64 cents throughout; days are counted from 1970-01-01 so
+they convert directly to numpy.datetime64[D].
+"""
+import numpy as np
+
+from db_helper import BUILTIN_CATEGORIES, category_key, to_iso_date
+
+
+def to_day(value):
+    """Convert a date / mm-dd-yyyy / ISO string to days since 1970-01-01 (None stays None)."""
+    if value is None or value == '':
+        return None
+    return int(np.datetime64(to_iso_date(value), 'D').astype(np.int64))
+
+
+class EntryColumns:
+    """Columnar snapshot of entries: id, day, cents, category code and income flag."""
+
+    def __init__(self, db):
+        self.db = db
+        self.marker = None          # (revision, max id) the arrays reflect
+        self.categories = []        # category code -> name
+        self.category_codes = {}    # name -> category code
+        self._reset()
+
+    def _reset(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.day = np.empty(0, dtype=np.int32)
+        self.cents = np.empty(0, dtype=np.int64)
+        self.category = np.empty(0, dtype=np.int32)
+        self.is_income = np.empty(0, dtype=bool)
+        self.categories = []
+        self.category_codes = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def refresh(self):
+        """Bring the arrays up to date with the database and return self.
+
+        Costs one tiny query when nothing changed and reads only the new
+        rows when entries were just added. If the rows cannot be read the
+        arrays and the marker are left as they were.
+        """
+        with self.db.snapshot():
+            marker = self.db.get_change_marker()
+            if marker is None or marker == self.marker:
+                return self
+            # Existing rows edited or deleted: start over
+            reload = self.marker is None or marker[0] != self.marker[0]
+            rows = self.db.get_column_rows(0 if reload else self.marker[1])
+        if rows is None:
+            return self
+        if reload:
+            self._reset()
+        self._append(rows)
+        self.marker = marker if not rows else (marker[0], max(marker[1], rows[-1][0]))
+        return self
+
+    def _append(self, rows):
+        if not rows:
+            return
+        ids, days, incomes, names, cents = zip(*rows)
+        codes = self.category_codes
+        for name in set(names).difference(codes):
+            codes[name] = len(self.categories)
+            self.categories.append(name)
+
+        self.ids = np.concatenate([self.ids, np.array(ids, dtype=np.int64)])
+        self.day = np.concatenate([self.day, np.array(days, dtype=np.int32)])
+        self.cents = np.concatenate([self.cents, np.array(cents, dtype=np.int64)])
+        self.category = np.concatenate([self.category, np.fromiter((codes[n] for n in names), np.int32, len(names))])
+        self.is_income = np.concatenate([self.is_income, np.array(incomes, dtype=bool)])
+
+    def mask(self, from_date=None, to_date=None, category=None, entry_type=None, ids=None):
+        """Boolean row mask for the same filters as ExpenseDBHelper.get_filtered_entries.
+
+        A search cannot be evaluated on the arrays; pass the matching entry
+        ids (ExpenseDBHelper.get_matching_ids) as ids instead.
+        """
+        mask = np.ones(len(self.ids), dtype=bool)
+        if ids is not None:
+            mask &= np.isin(self.ids, np.asarray(ids, dtype=np.int64))
+        from_day, to_day_ = to_day(from_date), to_day(to_date)
+        if from_day is not None:
+            mask &= self.day >= from_day
+        if to_day_ is not None:
+            mask &= self.day <= to_day_
+        if category and category != "All":
+            if category == "Other":
+                builtin = [self.category_codes[name] for name in BUILTIN_CATEGORIES if name in self.category_codes]
+                mask &= ~np.isin(self.category, builtin)
+            else:
+                key = category_key(category)
+                wanted = [code for name, code in self.category_codes.items() if category_key(name) == key]
+                mask &= np.isin(self.category, wanted)
+        if entry_type == "Income":
+            mask &= self.is_income
+        elif entry_type == "Expense":
+            mask &= ~self.is_income
+        return mask
+
+    def signed_cents(self):
+        """Amounts with expenses negative, i.e. each row's effect on the balance."""
+        return np.where(self.is_income, self.cents, -self.cents)
+
+    # ----- Breakdowns ---------------------------------------------------
+
+    def category_totals(self, **filters):
+        """Return (category, total cents, count) for the matching rows, largest total first."""
+        mask = self.mask(**filters)
+        size = len(self.categories)
+        totals = np.bincount(self.category[mask], weights=self.cents[mask], minlength=size)
+        counts = np.bincount(self.category[mask], minlength=size)
+        order = np.argsort(-totals, kind="stable")
+        return [(self.categories[code], int(round(totals[code])), int(counts[code]))
+                for code in order if counts[code]]
+
+    def monthly_totals(self, by_category=False, **filters):
+        """Return (months, totals) for the matching rows.
+
+        months is a datetime64[M] array from the first to the last month
+        with data. totals is an int64 array of cents per month, or, with
+        by_category, a (len(categories), len(months)) matrix.
+        """
+        mask = self.mask(**filters)
+        months = self.day[mask].astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        if not len(months):
+            return np.empty(0, dtype='datetime64[M]'), np.empty((len(self.categories), 0) if by_category else 0,
+                                                                dtype=np.int64)
+        first = months.min()
+        span = int(months.max() - first) + 1
+        offsets = months - first
+        cents = self.cents[mask]
+        if by_category:
+            cells = self.category[mask].astype(np.int64) * span + offsets
+            totals = np.bincount(cells, weights=cents, minlength=len(self.categories) * span)
+            totals = totals.reshape(len(self.categories), span)
+        else:
+            totals = np.bincount(offsets, weights=cents, minlength=span)
+        return np.arange(first, first + span).astype('datetime64[M]'), np.rint(totals).astype(np.int64)
+
+    def daily_totals(self, signed=False, **filters):
+        """Return (days, cents per day) covering every day from the first to the last matching row."""
+        mask = self.mask(**filters)
+        days = self.day[mask]
+        if not len(days):
+            return np.empty(0, dtype='datetime64[D]'), np.empty(0, dtype=np.int64)
+        first = int(days.min())
+        cents = self.signed_cents()[mask] if signed else self.cents[mask]
+        totals = np.bincount(days - first, weights=cents)
+        return np.arange(first, first + len(totals)).astype('datetime64[D]'), np.rint(totals).astype(np.int64)
+
+    def rolling_average(self, window=30, entry_type="Expense", **filters):
+        """Return (days, average cents per day over the trailing window days).
+
+        Averages one entry type, expenses unless told otherwise; with
+        entry_type "All" or None it averages the net change in balance.
+        """
+        signed = entry_type not in ("Income", "Expense")
+        days, totals = self.daily_totals(signed=signed, entry_type=entry_type, **filters)
+        if not len(totals):
+            return days, np.empty(0, dtype=np.float64)
+        running = np.concatenate([[0], np.cumsum(totals)])
+        index = np.arange(1, len(totals) + 1)
+        start = np.maximum(index - window, 0)
+        return days, (running[index] - running[start]) / np.minimum(index, window)
+
+    def cumulative_balance(self, **filters):
+        """Return (days, running balance in cents at the end of each day).
+
+        With a from_date the series starts from the balance of the entries
+        before it (under the other filters), not from zero.
+        """
+        filters.pop("entry_type", None)  # a balance needs both income and expenses
+        days, net = self.daily_totals(signed=True, **filters)
+        carried = 0
+        from_day = to_day(filters.get("from_date"))
+        if from_day is not None:
+            earlier = self.mask(**dict(filters, from_date=None, to_date=None)) & (self.day < from_day)
+            carried = int(self.signed_cents()[earlier].sum())
+        return days, carried + np.cumsum(net)
+
+    def percentiles(self, q=(50, 90, 99), **filters):
+        """Return the q-th percentiles of the matching amounts in cents (None when nothing matches)."""
+        cents = self.cents[self.mask(**filters)]
+        if not len(cents):
+            return None
+        return np.percentile(cents, q)
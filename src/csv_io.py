@@ -0,0 +1,145 @@
+import csv
+import hashlib
+import os
+
+from money import cents_to_str
+from validation import validate_entry
+
+CSV_HEADER = ['ID', 'Date', 'Type', 'Category', 'Amount', 'Note', 'Created At']
+
+# Rows fetched from SQLite and written to disk per step
+EXPORT_BATCH_SIZE = 2000
+# Size of the write buffer in front of the CSV file
+WRITE_BUFFER_SIZE = 1 << 20
+# Rows inserted per transaction (and per checkpoint) when importing
+IMPORT_BATCH_SIZE = 50000
+# Invalid rows reported back in detail; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+REQUIRED_COLUMNS = ['date', 'type', 'category', 'amount']
+
+
+def export_entries(db, path, progress=None, batch_size=EXPORT_BATCH_SIZE, **filters):
+    """Stream entries matching filters into a CSV file and return the number of rows written.
+
+    Only one batch is held in memory at a time. progress(rows_written) is
+    called after every batch; it runs on the exporting thread.
+    """
+    written = 0
+    with open(path, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(CSV_HEADER)
+        for batch in db.iter_entry_batches(batch_size, **filters):
+            # Amounts are stored in cents; the file holds plain decimals
+            writer.writerows((row[0], row[1], row[2], row[3], cents_to_str(row[4]), row[5], row[6])
+                             for row in batch)
+            written += len(batch)
+            if progress is not None:
+                progress(written)
+    return written
+
+
+class ImportResult:
+    """Outcome of import_entries."""
+
+    def __init__(self):
+        self.imported = 0      # new rows written
+        self.duplicates = 0    # rows skipped because they were imported before
+        self.invalid = 0       # rows rejected by validate_entry
+        self.errors = []       # (line number, message) for the first invalid rows
+        self.resumed_from = 0  # line an interrupted import was resumed after
+
+
+def import_key(entry, occurrences):
+    """Dedup key for an imported row.
+
+    Identical rows in one file (two coffees on the same day) are told apart
+    by how many times the same content was seen before, so importing the
+    file again yields the same keys and inserts nothing.
+    """
+    content = "\x1f".join((entry['date'], entry['type'], entry['category'].casefold(),
+                           cents_to_str(entry['amount']), entry['note']))
+    seen = occurrences.get(content, 0)
+    occurrences[content] = seen + 1
+    return hashlib.blake2b(f"{content}\x1f{seen}".encode('utf-8'), digest_size=12).hexdigest()
+
+
+def import_entries(db, path, progress=None, batch_size=IMPORT_BATCH_SIZE):
+    """Stream a CSV file into the database and return an ImportResult.
+
+    The file needs Date, Type, Category and Amount columns (any order, any
+    case; Note is optional), so files written by export_entries import
+    as-is. Rows are validated with the same rules as the entry forms and
+    inserted with executemany, batch_size rows per transaction. After every
+    batch a checkpoint is stored with it; if the same unchanged file is
+    imported again after an interruption, the already committed lines are
+    skipped. progress(lines_read) is called after every batch.
+    """
+    result = ImportResult()
+    source = os.path.abspath(path)
+    stat = os.stat(source)
+
+    resume_line = 0
+    saved = db.get_import_checkpoint(source)
+    if saved is not None and saved[0] == stat.st_size and saved[1] == stat.st_mtime:
+        resume_line, result.imported = saved[2], saved[3]
+        result.resumed_from = resume_line
+
+    occurrences = {}
+    batch = []
+    line = 1
+
+    def flush():
+        inserted = db.add_entries_bulk(
+            batch, checkpoint=(source, stat.st_size, stat.st_mtime, line, result.imported))
+        result.imported += inserted
+        result.duplicates += len(batch) - inserted
+        batch.clear()
+        if progress is not None:
+            progress(line)
+
+    with open(source, newline='', encoding='utf-8-sig') as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if header is None:
+            return result
+
+        names = [name.strip().lower() for name in header]
+        missing = [name for name in REQUIRED_COLUMNS if name not in names]
+        if missing:
+            raise ValueError(f"CSV file is missing column(s): {', '.join(missing)}")
+        date_col, type_col, category_col, amount_col = (names.index(name) for name in REQUIRED_COLUMNS)
+        note_col = names.index('note') if 'note' in names else None
+        width = max(date_col, type_col, category_col, amount_col, note_col or 0) + 1
+
+        for line, row in enumerate(reader, start=2):
+            if len(row) < width:
+                if not any(cell.strip() for cell in row):
+                    continue  # blank line
+                row = row + [''] * (width - len(row))
+            try:
+                entry = validate_entry(row[type_col].strip().capitalize(),
+                                       row[amount_col].strip(),
+                                       row[category_col],
+                                       row[date_col].strip(),
+                                       row[note_col] if note_col is not None else "")
+            except ValueError as e:
+                if line > resume_line:
+                    result.invalid += 1
+                    if len(result.errors) < MAX_REPORTED_ERRORS:
+                        result.errors.append((line, str(e)))
+                continue
+
+            # Keys are computed for skipped lines too so occurrence counts match
+            entry['import_key'] = import_key(entry, occurrences)
+            if line <= resume_line:
+                continue
+            batch.append(entry)
+            if len(batch) >= batch_size:
+                flush()
+
+        if batch:
+            flush()
+
+    db.clear_import_checkpoint(source)
+    return result
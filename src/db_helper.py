@@ -1,221 +1,1539 @@
 import sqlite3
 import os
-from datetime import datetime
+import re
+import sys
+import threading
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from instrumentation import instrument, trace_sql
+
+# Dates are stored as ISO-8601 strings (YYYY-MM-DD) so that string order is
+# chronological order and range filters can seek on idx_entries_date.
+# The UI shows and edits them as mm-dd-yyyy.
+DISPLAY_DATE_FORMAT = '%m-%d-%Y'
+
+# Categories offered by the entry forms; every other category counts as "Other"
+BUILTIN_CATEGORIES = ('Food', 'Transport', 'Utilities', 'Entertainment')
+
+
+def to_iso_date(value):
+    """Convert a date object or a mm-dd-yyyy / ISO string to YYYY-MM-DD."""
+    if value is None or value == '':
+        return value
+    if isinstance(value, (date, datetime)):
+        return value.strftime('%Y-%m-%d')
+    # Fast paths for the two fixed-width formats (strptime is slow in bulk imports)
+    if len(value) == 10 and value[4] == '-' and value[7] == '-':
+        return date(int(value[:4]), int(value[5:7]), int(value[8:])).isoformat()
+    if len(value) == 10 and value[2] == '-' and value[5] == '-':
+        return date(int(value[6:]), int(value[:2]), int(value[3:5])).isoformat()
+    return datetime.strptime(value, DISPLAY_DATE_FORMAT).strftime('%Y-%m-%d')
+
+
+def category_key(name):
+    """Case-folded form of a category name; names with the same key are one category."""
+    return name.casefold()
+
+
+def _migrate_iso_dates(cursor):
+    """v1: rewrite mm-dd-yyyy dates as YYYY-MM-DD and index the date column."""
+    cursor.execute('''
+        UPDATE entries
+        SET date = substr(date, 7, 4) || '-' || substr(date, 1, 2) || '-' || substr(date, 4, 2)
+        WHERE date GLOB '[0-9][0-9]-[0-9][0-9]-[0-9][0-9][0-9][0-9]'
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_entries_date ON entries(date)')
+
+
+def _migrate_filter_indexes(cursor):
+    """v2: indexes for the type and category filters and the SUM(amount) totals."""
+    # (type, date, amount) covers both the per-type totals and type+date filters
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_entries_type_date_amount ON entries(type, date, amount)')
+    # Matches the case-insensitive "category = ? COLLATE NOCASE" filter
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_entries_category_date ON entries(category COLLATE NOCASE, date)')
+
+
+def _migrate_entry_totals(cursor):
+    """v3: per-type running totals kept in step with entries by triggers."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS entry_totals (
+            type TEXT PRIMARY KEY,
+            total REAL NOT NULL DEFAULT 0,
+            count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_entry_totals_insert AFTER INSERT ON entries
+        BEGIN
+            INSERT OR IGNORE INTO entry_totals (type) VALUES (new.type);
+            UPDATE entry_totals SET total = total + new.amount, count = count + 1
+            WHERE type = new.type;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_entry_totals_delete AFTER DELETE ON entries
+        BEGIN
+            UPDATE entry_totals SET total = total - old.amount, count = count - 1
+            WHERE type = old.type;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_entry_totals_update AFTER UPDATE OF type, amount ON entries
+        BEGIN
+            UPDATE entry_totals SET total = total - old.amount, count = count - 1
+            WHERE type = old.type;
+            INSERT OR IGNORE INTO entry_totals (type) VALUES (new.type);
+            UPDATE entry_totals SET total = total + new.amount, count = count + 1
+            WHERE type = new.type;
+        END
+    ''')
+    _rebuild_entry_totals(cursor)
+
+
+def _rebuild_entry_totals(cursor):
+    """Recompute entry_totals from a full pass over entries."""
+    cursor.execute('DELETE FROM entry_totals')
+    cursor.execute('''
+        INSERT INTO entry_totals (type, total, count)
+        SELECT type, SUM(amount), COUNT(*) FROM entries GROUP BY type
+    ''')
+
+
+def _migrate_import_support(cursor):
+    """v4: dedup key for imported rows and resumable import checkpoints."""
+    cursor.execute('ALTER TABLE entries ADD COLUMN import_key TEXT')
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_entries_import_key
+        ON entries(import_key) WHERE import_key IS NOT NULL
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS import_checkpoints (
+            source TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            line INTEGER NOT NULL,
+            imported INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+# Trigger steps that move one row into / out of its monthly_rollup group.
+# Min/max cannot be undone incrementally, so removing the row that held
+# a group's min or max recomputes them from that group's entries.
+# These v5 versions key groups by the category text; v8 replaces them.
+_V5_ROLLUP_ADD_NEW = '''
+    INSERT INTO monthly_rollup (month, category, type, total, count, min_amount, max_amount)
+    VALUES (substr(new.date, 1, 7), new.category, new.type, new.amount, 1, new.amount, new.amount)
+    ON CONFLICT (month, category, type) DO UPDATE SET
+        total = total + excluded.total,
+        count = count + 1,
+        min_amount = MIN(min_amount, excluded.min_amount),
+        max_amount = MAX(max_amount, excluded.max_amount);
+'''
+_V5_ROLLUP_REMOVE_OLD = '''
+    UPDATE monthly_rollup SET total = total - old.amount, count = count - 1
+    WHERE month = substr(old.date, 1, 7) AND category = old.category AND type = old.type;
+    DELETE FROM monthly_rollup
+    WHERE month = substr(old.date, 1, 7) AND category = old.category AND type = old.type AND count <= 0;
+    UPDATE monthly_rollup SET
+        min_amount = (SELECT MIN(amount) FROM entries
+                      WHERE category = old.category COLLATE NOCASE AND category = old.category
+                        AND date BETWEEN month || '-01' AND month || '-31' AND type = old.type),
+        max_amount = (SELECT MAX(amount) FROM entries
+                      WHERE category = old.category COLLATE NOCASE AND category = old.category
+                        AND date BETWEEN month || '-01' AND month || '-31' AND type = old.type)
+    WHERE month = substr(old.date, 1, 7) AND category = old.category AND type = old.type
+      AND (old.amount <= min_amount OR old.amount >= max_amount);
+'''
+
+
+def _migrate_monthly_rollup(cursor):
+    """v5: per (month, category, type) sum/count/min/max kept in step with entries by triggers."""
+    # month is the YYYY-MM prefix of the ISO date, so month ranges compare as strings
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS monthly_rollup (
+            month TEXT NOT NULL,
+            category TEXT NOT NULL,
+            type TEXT NOT NULL,
+            total REAL NOT NULL,
+            count INTEGER NOT NULL,
+            min_amount REAL NOT NULL,
+            max_amount REAL NOT NULL,
+            PRIMARY KEY (month, category, type)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_rollup_insert AFTER INSERT ON entries
+        BEGIN {_V5_ROLLUP_ADD_NEW} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_rollup_delete AFTER DELETE ON entries
+        BEGIN {_V5_ROLLUP_REMOVE_OLD} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_monthly_rollup_update AFTER UPDATE OF date, type, category, amount ON entries
+        BEGIN {_V5_ROLLUP_REMOVE_OLD} {_V5_ROLLUP_ADD_NEW} END
+    ''')
+    _rebuild_monthly_rollup(cursor, 'category')
+
+
+def _rebuild_monthly_rollup(cursor, category_column='category_id'):
+    """Recompute monthly_rollup from a full pass over entries.
+
+    Schema versions before v8 group by the 'category' text column.
+    """
+    cursor.execute('DELETE FROM monthly_rollup')
+    cursor.execute(f'''
+        INSERT INTO monthly_rollup (month, {category_column}, type, total, count, min_amount, max_amount)
+        SELECT substr(date, 1, 7), {category_column}, type, SUM(amount), COUNT(*), MIN(amount), MAX(amount)
+        FROM entries GROUP BY 1, 2, 3
+    ''')
+
+
+def _migrate_entry_revision(cursor):
+    """v6: counter bumped whenever an existing entry is updated or deleted.
+
+    Ids only grow (AUTOINCREMENT), so a reader that remembers the highest id
+    and this counter can tell whether new rows were merely appended.
+    """
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS entry_revision (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            revision INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('INSERT OR IGNORE INTO entry_revision (id, revision) VALUES (1, 0)')
+    for event in ('UPDATE', 'DELETE'):
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_entry_revision_{event.lower()} AFTER {event} ON entries
+            BEGIN
+                UPDATE entry_revision SET revision = revision + 1 WHERE id = 1;
+            END
+        ''')
+
+
+def _entries_schema(cursor):
+    """Return (name, sql) of the indexes and triggers on entries."""
+    return cursor.execute('''
+        SELECT name, sql FROM sqlite_master
+        WHERE tbl_name = 'entries' AND type IN ('index', 'trigger') AND sql IS NOT NULL
+    ''').fetchall()
+
+
+def _replace_entries_table(cursor, columns, select):
+    """Rebuild entries with new column definitions, filled from select over the old table.
+
+    SQLite cannot change a column's type in place, so the rows are copied
+    into a new table, keeping their ids and the AUTOINCREMENT sequence.
+    Indexes and triggers go away with the old table; callers recreate them.
+    """
+    # Databases created before AUTOINCREMENT have no sqlite_sequence yet
+    sequence = None
+    if cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence'").fetchone():
+        sequence = cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'entries'").fetchone()
+
+    cursor.execute(f'CREATE TABLE entries_new ({columns})')
+    cursor.execute(f'INSERT INTO entries_new {select}')
+    cursor.execute('DROP TABLE entries')
+    cursor.execute('ALTER TABLE entries_new RENAME TO entries')
+    if sequence is not None:
+        cursor.execute("DELETE FROM sqlite_sequence WHERE name = 'entries'")
+        cursor.execute('''
+            INSERT INTO sqlite_sequence (name, seq)
+            SELECT 'entries', MAX(?, COALESCE((SELECT MAX(id) FROM entries), 0))
+        ''', sequence)
+
+
+def _migrate_integer_cents(cursor):
+    """v7: store amounts as INTEGER cents so that every total is an exact integer sum.
+
+    entries is rebuilt with an INTEGER amount column and its indexes and
+    triggers are recreated from their stored SQL. The summary tables get
+    INTEGER columns and are rebuilt.
+    """
+    schema = _entries_schema(cursor)
+    _replace_entries_table(cursor, '''
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL,
+        type TEXT NOT NULL,
+        category TEXT NOT NULL,
+        amount INTEGER NOT NULL,
+        note TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        import_key TEXT
+    ''', '''
+        SELECT id, date, type, category, CAST(ROUND(amount * 100) AS INTEGER), note, created_at, import_key
+        FROM entries
+    ''')
+
+    cursor.execute('DROP TABLE entry_totals')
+    cursor.execute('''
+        CREATE TABLE entry_totals (
+            type TEXT PRIMARY KEY,
+            total INTEGER NOT NULL DEFAULT 0,
+            count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.execute('DROP TABLE monthly_rollup')
+    cursor.execute('''
+        CREATE TABLE monthly_rollup (
+            month TEXT NOT NULL,
+            category TEXT NOT NULL,
+            type TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            min_amount INTEGER NOT NULL,
+            max_amount INTEGER NOT NULL,
+            PRIMARY KEY (month, category, type)
+        ) WITHOUT ROWID
+    ''')
+    for name, sql in schema:
+        cursor.execute(sql)
+    _rebuild_entry_totals(cursor)
+    _rebuild_monthly_rollup(cursor, 'category')
+
+
+# Current monthly_rollup trigger steps, keyed by category_id (see the v5 versions above)
+_ROLLUP_ADD_NEW = '''
+    INSERT INTO monthly_rollup (month, category_id, type, total, count, min_amount, max_amount)
+    VALUES (substr(new.date, 1, 7), new.category_id, new.type, new.amount, 1, new.amount, new.amount)
+    ON CONFLICT (month, category_id, type) DO UPDATE SET
+        total = total + excluded.total,
+        count = count + 1,
+        min_amount = MIN(min_amount, excluded.min_amount),
+        max_amount = MAX(max_amount, excluded.max_amount);
+'''
+_ROLLUP_REMOVE_OLD = '''
+    UPDATE monthly_rollup SET total = total - old.amount, count = count - 1
+    WHERE month = substr(old.date, 1, 7) AND category_id = old.category_id AND type = old.type;
+    DELETE FROM monthly_rollup
+    WHERE month = substr(old.date, 1, 7) AND category_id = old.category_id AND type = old.type AND count <= 0;
+    UPDATE monthly_rollup SET
+        min_amount = (SELECT MIN(amount) FROM entries
+                      WHERE category_id = old.category_id
+                        AND date BETWEEN month || '-01' AND month || '-31' AND type = old.type),
+        max_amount = (SELECT MAX(amount) FROM entries
+                      WHERE category_id = old.category_id
+                        AND date BETWEEN month || '-01' AND month || '-31' AND type = old.type)
+    WHERE month = substr(old.date, 1, 7) AND category_id = old.category_id AND type = old.type
+      AND (old.amount <= min_amount OR old.amount >= max_amount);
+'''
+
+
+def _migrate_category_table(cursor):
+    """v8: move category names into a categories table that entries reference by id.
+
+    Spellings that differ only in case become one category, named after
+    the most used spelling. The category index, monthly_rollup and its
+    triggers switch from the text column to category_id.
+    """
+    cursor.execute('''
+        CREATE TABLE categories (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            name_key TEXT NOT NULL UNIQUE,
+            is_builtin INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.executemany('INSERT INTO categories (name, name_key, is_builtin) VALUES (?, ?, 1)',
+                       [(name, category_key(name)) for name in BUILTIN_CATEGORIES])
+    ids = dict(cursor.execute('SELECT name_key, id FROM categories').fetchall())
+
+    cursor.execute('CREATE TEMP TABLE category_map (category TEXT PRIMARY KEY, category_id INTEGER NOT NULL)')
+    spellings = cursor.execute('SELECT category FROM entries GROUP BY category ORDER BY COUNT(*) DESC, category').fetchall()
+    for (name,) in spellings:
+        key = category_key(name)
+        if key not in ids:
+            cursor.execute('INSERT INTO categories (name, name_key) VALUES (?, ?)', (name, key))
+            ids[key] = cursor.lastrowid
+        cursor.execute('INSERT INTO temp.category_map (category, category_id) VALUES (?, ?)', (name, ids[key]))
+
+    schema = _entries_schema(cursor)
+    _replace_entries_table(cursor, '''
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL,
+        type TEXT NOT NULL,
+        category_id INTEGER NOT NULL REFERENCES categories(id),
+        amount INTEGER NOT NULL,
+        note TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        import_key TEXT
+    ''', '''
+        SELECT id, date, type, category_map.category_id, amount, note, created_at, import_key
+        FROM entries JOIN temp.category_map USING (category)
+    ''')
+    cursor.execute('DROP TABLE temp.category_map')
+
+    # Everything except the category index and the rollup triggers is unchanged
+    for name, sql in schema:
+        if name != 'idx_entries_category_date' and not name.startswith('trg_monthly_rollup_'):
+            cursor.execute(sql)
+    cursor.execute('CREATE INDEX idx_entries_category_date ON entries(category_id, date)')
+
+    cursor.execute('DROP TABLE monthly_rollup')
+    cursor.execute('''
+        CREATE TABLE monthly_rollup (
+            month TEXT NOT NULL,
+            category_id INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            min_amount INTEGER NOT NULL,
+            max_amount INTEGER NOT NULL,
+            PRIMARY KEY (month, category_id, type)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_monthly_rollup_insert AFTER INSERT ON entries
+        BEGIN {_ROLLUP_ADD_NEW} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_monthly_rollup_delete AFTER DELETE ON entries
+        BEGIN {_ROLLUP_REMOVE_OLD} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_monthly_rollup_update AFTER UPDATE OF date, type, category_id, amount ON entries
+        BEGIN {_ROLLUP_REMOVE_OLD} {_ROLLUP_ADD_NEW} END
+    ''')
+    _rebuild_monthly_rollup(cursor)
+
+
+def _migrate_search_index(cursor):
+    """v9: FTS5 index over each entry's note and category name, kept in step by triggers.
+
+    The table is contentless (content=''): it stores only the index, with
+    the entry id as rowid. SQLite builds without FTS5 get no index, and
+    search falls back to LIKE scans.
+    """
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE entries_fts USING fts5(
+                note, category, content='', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        ''')
+    except sqlite3.OperationalError:
+        return  # no such module: fts5
+    # Rank note matches above category matches
+    cursor.execute("INSERT INTO entries_fts (entries_fts, rank) VALUES ('rank', 'bm25(2.0, 1.0)')")
+
+    # A contentless table forgets a row by being given back its indexed values
+    add_new = '''
+        INSERT INTO entries_fts (rowid, note, category)
+        VALUES (new.id, new.note, (SELECT name FROM categories WHERE id = new.category_id));
+    '''
+    remove_old = '''
+        INSERT INTO entries_fts (entries_fts, rowid, note, category)
+        VALUES ('delete', old.id, old.note, (SELECT name FROM categories WHERE id = old.category_id));
+    '''
+    cursor.execute(f'CREATE TRIGGER trg_entries_fts_insert AFTER INSERT ON entries BEGIN {add_new} END')
+    cursor.execute(f'CREATE TRIGGER trg_entries_fts_delete AFTER DELETE ON entries BEGIN {remove_old} END')
+    cursor.execute(f'''
+        CREATE TRIGGER trg_entries_fts_update AFTER UPDATE OF note, category_id ON entries
+        BEGIN {remove_old} {add_new} END
+    ''')
+    _rebuild_search_index(cursor)
+
+
+def _rebuild_search_index(cursor):
+    """Re-index every entry in entries_fts (a no-op without FTS5)."""
+    if not cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'entries_fts'").fetchone():
+        return
+    cursor.execute("INSERT INTO entries_fts (entries_fts) VALUES ('delete-all')")
+    cursor.execute(f'''
+        INSERT INTO entries_fts (rowid, note, category)
+        SELECT id, note, {CATEGORY_NAME} FROM entries
+    ''')
+
+
+# A full scan of entries in EXPLAIN QUERY PLAN output: "SCAN entries" (SQLite
+# 3.36+) or "SCAN TABLE entries" (older). A scan of a covering index is fine.
+_FULL_SCAN = re.compile(r'^SCAN (TABLE )?entries(\s|$)(?!USING (COVERING )?INDEX)')
+
+
+def is_interrupted(error):
+    """True when error comes from interrupt() cancelling the running statement.
+
+    Read methods re-raise these instead of reporting them, so a query
+    superseded by a newer one is not mistaken for a failure.
+    """
+    return isinstance(error, sqlite3.OperationalError) and str(error) == "interrupted"
+
+
+def is_full_scan(detail):
+    """True when a query plan step reads the whole entries table."""
+    return _FULL_SCAN.match(detail) is not None
+
+
+def search_terms(text):
+    """Split search box text into words; punctuation-only words are dropped."""
+    return [word for word in (text or '').split() if any(char.isalnum() for char in word)]
+
+
+def fts_query(text):
+    """FTS5 query for search box text: every word must match the start of a word."""
+    return ' '.join('"{}"*'.format(word.replace('"', '""')) for word in search_terms(text))
+
+
+def _is_latin(char):
+    # The letters unicode61's remove_diacritics strips accents from
+    return char < '\u0250' or '\u1e00' <= char <= '\u1eff'
+
+
+@lru_cache(maxsize=65536)
+def index_words(text):
+    """The words entries_fts indexes for text, as its unicode61 tokenizer splits and folds them.
+
+    Words are split at anything but letters and digits and lowercased, not
+    case-folded ('Straße' stays 'straße', ligatures stay). Accents are
+    dropped from Latin letters only; a final sigma is indexed as σ.
+    """
+    text = ''.join(unicodedata.normalize('NFD', char) if _is_latin(char) else char for char in text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return tuple(re.findall(r'[^\W_]+', text.lower().replace('ς', 'σ')))
+
+
+def search_phrases(text):
+    """Search box text as entries_fts sees each word (see fts_query)."""
+    return [phrase for phrase in map(index_words, search_terms(text)) if phrase]
+
+
+def _phrase_in(words, phrase):
+    # Like an FTS5 "a b"* phrase: whole words in a row, the last one as a prefix
+    *whole, prefix = phrase
+    for start in range(len(words) - len(whole)):
+        if list(words[start:start + len(whole)]) == whole and words[start + len(whole)].startswith(prefix):
+            return True
+    return False
+
+
+def entry_matcher(from_date=None, to_date=None, category=None, entry_type=None, search=None):
+    """Return a predicate telling whether an ENTRY_SELECT row passes the filters.
+
+    Same meaning as build_filter_conditions with the FTS5 index, so an
+    already loaded result can be narrowed without a query.
+    """
+    from_date, to_date = to_iso_date(from_date), to_iso_date(to_date)
+    builtin = {category_key(name) for name in BUILTIN_CATEGORIES}
+    if not category or category == "All":
+        wanted_category = None
+    elif category == "Other":
+        wanted_category = lambda name: category_key(name) not in builtin
+    else:
+        key = category_key(category)
+        wanted_category = lambda name: category_key(name) == key
+    entry_type = entry_type if entry_type and entry_type != "All" else None
+    phrases = search_phrases(search)
+    found = {}  # (note, category) -> search result; notes repeat a lot
+
+    def matches(entry):
+        if from_date and entry[1] < from_date or to_date and entry[1] > to_date:
+            return False
+        if entry_type and entry[2] != entry_type:
+            return False
+        if wanted_category and not wanted_category(entry[3]):
+            return False
+        if phrases:
+            text = entry[5], entry[3]
+            result = found.get(text)
+            if result is None:
+                columns = (index_words(entry[5]), index_words(entry[3]))
+                result = found[text] = all(any(_phrase_in(words, phrase) for words in columns)
+                                           for phrase in phrases)
+            return result
+        return True
+    return matches
+
+
+def filters_within(filters, previous):
+    """True when every entry passing filters also passes previous.
+
+    Both are get_filtered_entries keyword arguments. A result loaded for
+    previous can then be narrowed to filters with entry_matcher.
+    """
+    def implied(old, new):
+        # Prefix search: "coff" is implied by "coffee", "e-m" by "e-mail"
+        return len(old) == len(new) and old[:-1] == new[:-1] and new[-1].startswith(old[-1])
+
+    old_from, new_from = to_iso_date(previous.get('from_date')), to_iso_date(filters.get('from_date'))
+    old_to, new_to = to_iso_date(previous.get('to_date')), to_iso_date(filters.get('to_date'))
+    if old_from and not (new_from and new_from >= old_from) or old_to and not (new_to and new_to <= old_to):
+        return False
+    for name in ('category', 'entry_type'):
+        old = previous.get(name)
+        if old and old != "All" and old != filters.get(name):
+            return False
+    new_phrases = search_phrases(filters.get('search'))
+    return all(any(implied(old, new) for new in new_phrases) for old in search_phrases(previous.get('search')))
+
+
+# Schema migrations, applied in order. The database's PRAGMA user_version
+# records how many of them have already run.
+MIGRATIONS = [
+    _migrate_iso_dates,
+    _migrate_filter_indexes,
+    _migrate_entry_totals,
+    _migrate_import_support,
+    _migrate_monthly_rollup,
+    _migrate_entry_revision,
+    _migrate_integer_cents,
+    _migrate_category_table,
+    _migrate_search_index,
+]
+
+# Name of the category a category_id refers to, for queries on entries or monthly_rollup
+CATEGORY_NAME = '(SELECT name FROM categories WHERE categories.id = category_id)'
+
+# Entry rows are always returned in this column order:
+# (id, date, type, category name, amount, note, created_at), with amount in integer cents
+ENTRY_SELECT = f'SELECT id, date, type, {CATEGORY_NAME}, amount, note, created_at FROM entries'
+
+# Income, expense and row count from the trigger-maintained entry_totals rows
+CACHED_TOTALS_QUERY = '''
+    SELECT COALESCE(SUM(CASE WHEN type = 'Income' THEN total END), 0),
+           COALESCE(SUM(CASE WHEN type = 'Expense' THEN total END), 0),
+           COALESCE(SUM(count), 0)
+    FROM entry_totals
+'''
+
+# Income, expense and row count in a single pass over the matching rows
+TOTALS_QUERY = '''
+    SELECT COALESCE(SUM(CASE WHEN type = 'Income' THEN amount END), 0),
+           COALESCE(SUM(CASE WHEN type = 'Expense' THEN amount END), 0),
+           COUNT(*)
+    FROM entries
+'''
+
+# The same three figures summed over monthly_rollup groups
+ROLLUP_TOTALS_QUERY = '''
+    SELECT COALESCE(SUM(CASE WHEN type = 'Income' THEN total END), 0),
+           COALESCE(SUM(CASE WHEN type = 'Expense' THEN total END), 0),
+           COALESCE(SUM(count), 0)
+    FROM monthly_rollup
+'''
+
+# Per (category, type) sum, count, min and max, from the rollup and from raw rows
+ROLLUP_SUMMARY_QUERY = f'''
+    SELECT {CATEGORY_NAME}, type, SUM(total), SUM(count), MIN(min_amount), MAX(max_amount)
+    FROM monthly_rollup
+'''
+ENTRY_SUMMARY_QUERY = f'''
+    SELECT {CATEGORY_NAME}, type, SUM(amount), COUNT(*), MIN(amount), MAX(amount)
+    FROM entries
+'''
+
+
+def _shift_month(month, step):
+    """Return the YYYY-MM month step months after month."""
+    index = int(month[:4]) * 12 + int(month[5:7]) - 1 + step
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def split_period(from_date=None, to_date=None):
+    """Split an ISO date range into whole months and partial-month edges.
+
+    Returns (months, edges). months is a (first, last) pair of YYYY-MM
+    months that can be answered from monthly_rollup (None on an open end),
+    or None when the range covers no whole month. edges holds at most two
+    (from, to) date ranges that still have to be read from entries.
+    """
+    edges = []
+    first = last = None
+    if from_date:
+        first = from_date[:7]
+        if from_date[8:] != '01':
+            first = _shift_month(first, 1)
+            edges.append((from_date, (date.fromisoformat(first + '-01') - timedelta(days=1)).isoformat()))
+    if to_date:
+        last = to_date[:7]
+        if (date.fromisoformat(to_date) + timedelta(days=1)).day != 1:
+            edges.append((last + '-01', to_date))
+            last = _shift_month(last, -1)
+    if first and last and first > last:
+        # No whole month in between: read the range itself
+        return None, [(from_date, to_date)] if from_date <= to_date else []
+    return (first, last), edges
+
+
+# Bounds of the per-connection result cache for filtered reads
+RESULT_CACHE_ENTRIES = 32
+RESULT_CACHE_BYTES = 32 * 1024 * 1024
+
+
+def _estimate_size(result):
+    """Rough memory footprint of a cached result, measured on a sample of its rows."""
+    if not isinstance(result, list):
+        return sys.getsizeof(result) + 64
+    if not result:
+        return sys.getsizeof(result)
+    sample = result[:50]
+    per_row = sum(sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) for row in sample) / len(sample)
+    return sys.getsizeof(result) + int(per_row * len(result))
+
 
 class ExpenseDBHelper:
-    def __init__(self):
+    def __init__(self, db_path=None):
         self.db_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
-        if not os.path.exists(self.db_dir):
-            os.makedirs(self.db_dir)
+        if db_path is None:
+            if not os.path.exists(self.db_dir):
+                os.makedirs(self.db_dir)
+            db_path = os.path.join(self.db_dir, 'expenses.db')
+
+        self.db_path = db_path
+        # One long-lived connection shared by every method, opened on first
+        # use (see conn). The lock makes it safe to use from worker threads
+        # as well as the Tk mainloop.
+        self._lock = threading.RLock()
+        self._conn = None
+
+        # LRU cache of filtered results: key -> (result, size). It is valid
+        # for one cache version: the generation counter (bumped by our own
+        # writes) plus PRAGMA data_version (changes when another connection,
+        # e.g. the UI's worker thread, commits).
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._generation = 0
+        self._cache_version = None
+
+        # In-memory copy of the categories table, loaded on first use:
+        # name_key -> id, id -> name and id -> number of entries. Writes
+        # through this helper keep it up to date; listeners hear about
+        # changes to the set of categories in use.
+        self._category_ids = None
+        self._category_names = {}
+        self._category_counts = {}
+        self._category_version = None
+        self._category_listeners = []
+
+        # Whether entries_fts exists (SQLite may be built without FTS5)
+        self._full_text_search = False
+
+    @property
+    def conn(self):
+        """The shared connection, opened and migrated on first use.
+
+        Creating a helper is free, so importing this module (and its
+        module-level db) does not touch the disk; the app opens the
+        database after its window is on screen. If the migrations fail the
+        connection is closed again and the error raised, so the next use
+        retries instead of running on a half-initialized database.
+        """
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    conn = self._conn = self.connect()
+                    try:
+                        self.init_database()
+                    except sqlite3.Error:
+                        self._conn = None
+                        conn.close()
+                        raise
+        return self._conn
+
+    @property
+    def full_text_search(self):
+        """Whether entries_fts exists (SQLite may be built without FTS5)."""
+        try:
+            self.conn
+        except sqlite3.Error:
+            return False
+        return self._full_text_search
+
+    def connect(self):
+        """Open a connection with the pragmas tuned for this app."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+        conn.execute('PRAGMA temp_store = MEMORY')
+        conn.execute('PRAGMA cache_size = -16000')  # ~16 MB page cache
+        conn.execute('PRAGMA mmap_size = 268435456')
+        # entries.category_id must name a row in categories
+        conn.execute('PRAGMA foreign_keys = ON')
+        trace_sql(conn)
+        return conn
+
+    def close(self):
+        """Close the shared connection."""
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.execute('PRAGMA optimize')
+                except sqlite3.Error:
+                    pass
+                self._conn.close()
+                self._conn = None
+
+    def interrupt(self):
+        """Abort the statement running on the shared connection (from any thread)."""
+        conn = self._conn
+        if conn is not None:
+            conn.interrupt()
 
-        self.db_path = os.path.join(self.db_dir, 'expenses.db')
-        self.init_database()
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @contextmanager
+    def snapshot(self):
+        """Run several reads inside one read transaction on the shared connection."""
+        with self._lock:
+            self.conn.execute('BEGIN')
+            try:
+                yield self
+            finally:
+                self.conn.execute('COMMIT')
+
+    @contextmanager
+    def _category_write(self):
+        """Run a write that may add categories in one transaction and yield its cursor.
+
+        category_ids caches new categories before the transaction commits,
+        so if it is rolled back for any reason (not only sqlite3.Error) the
+        in-memory categories are dropped and re-read on next use.
+        """
+        with self._lock:
+            try:
+                with self.conn:
+                    yield self.conn.cursor()
+            except BaseException:
+                self._category_ids = None
+                raise
+
+    def invalidate_cache(self):
+        """Drop every cached result; called after each write on this connection."""
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+            self._cache_bytes = 0
+
+    def _cache_get(self, key):
+        """Return the cached result for key, or None. Call with the lock held."""
+        version = (self._generation, self.conn.execute('PRAGMA data_version').fetchone()[0])
+        if version != self._cache_version:
+            self._cache.clear()
+            self._cache_bytes = 0
+            self._cache_version = version
+            return None
+        hit = self._cache.get(key)
+        if hit is None:
+            return None
+        self._cache.move_to_end(key)
+        return hit[0]
+
+    def _cache_put(self, key, result):
+        """Store result for key, evicting least recently used results. Call with the lock held."""
+        size = _estimate_size(result)
+        if size > RESULT_CACHE_BYTES:
+            return
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self._cache_bytes -= old[1]
+        self._cache[key] = (result, size)
+        self._cache_bytes += size
+        while len(self._cache) > RESULT_CACHE_ENTRIES or self._cache_bytes > RESULT_CACHE_BYTES:
+            _, (_, evicted_size) = self._cache.popitem(last=False)
+            self._cache_bytes -= evicted_size
+
+    def filter_key(self, from_date=None, to_date=None, category=None, entry_type=None, search=None):
+        """Normalize filter arguments so equivalent filters share a cache entry."""
+        return (
+            to_iso_date(from_date) or None,
+            to_iso_date(to_date) or None,
+            None if not category or category == "All" else category,
+            None if not entry_type or entry_type == "All" else entry_type,
+            ' '.join(search_terms(search)) or None,
+        )
 
     def init_database(self):
-        """Initialize the database and create tables if they don't exist."""
+        """Initialize the database, create tables and apply pending migrations.
+
+        Raises sqlite3.Error if that fails; nothing is changed then.
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock, self.conn:
+                cursor = self.conn.cursor()
+                cursor.execute('BEGIN IMMEDIATE')
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS entries (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     date TEXT NOT NULL,
                     type TEXT NOT NULL,
                     category TEXT NOT NULL,
-                    amount REAL NOT NULL,
+                    amount INTEGER NOT NULL,
                     note TEXT,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
                 ''')
-                conn.commit()
+                self.apply_migrations(cursor)
+                self._full_text_search = cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE name = 'entries_fts'").fetchone() is not None
         except sqlite3.Error as e:
             print(f"Error initializing database: {e}")
+            raise
+
+    def apply_migrations(self, cursor):
+        """Run every migration newer than the stored schema version."""
+        version = cursor.execute('PRAGMA user_version').fetchone()[0]
+        for target in range(version + 1, len(MIGRATIONS) + 1):
+            MIGRATIONS[target - 1](cursor)
+            cursor.execute(f'PRAGMA user_version = {target}')
+
+    def _load_categories(self):
+        """Read the categories and their entry counts into memory. Call with the lock held."""
+        cursor = self.conn.cursor()
+        rows = cursor.execute('SELECT id, name, name_key FROM categories').fetchall()
+        self._category_ids = {key: category_id for category_id, name, key in rows}
+        self._category_names = {category_id: name for category_id, name, key in rows}
+        # monthly_rollup already holds per-category counts, so this does not scan entries
+        self._category_counts = dict(cursor.execute(
+            'SELECT category_id, SUM(count) FROM monthly_rollup GROUP BY category_id').fetchall())
+        self._category_version = cursor.execute('PRAGMA data_version').fetchone()[0]
+
+    def _categories_in_use(self):
+        """Sorted names of the categories that have entries. Call with the lock held."""
+        return sorted(self._category_names[category_id]
+                      for category_id, count in self._category_counts.items() if count > 0)
 
+    def category_ids(self, cursor, names):
+        """Return {name: category id} for names, adding categories not seen before.
+
+        Call it inside _category_write(), which forgets the added ones if the write fails.
+        """
+        if self._category_ids is None:
+            self._load_categories()
+        ids = {}
+        for name in set(names):
+            key = category_key(name)
+            category_id = self._category_ids.get(key)
+            if category_id is None:
+                cursor.execute('INSERT OR IGNORE INTO categories (name, name_key) VALUES (?, ?)', (name, key))
+                category_id, stored_name = cursor.execute(
+                    'SELECT id, name FROM categories WHERE name_key = ?', (key,)).fetchone()
+                self._category_ids[key] = category_id
+                self._category_names[category_id] = stored_name
+            ids[name] = category_id
+        return ids
+
+    def _count_categories(self, changes):
+        """Apply {category id: change in entry count} from a committed write.
+
+        changes=None re-reads the counts instead. Listeners are notified
+        when a category gains its first entry or loses its last one.
+        """
+        with self._lock:
+            if self._category_ids is None:
+                return
+            before = self._categories_in_use()
+            if changes is None:
+                self._load_categories()
+            else:
+                for category_id, change in changes.items():
+                    self._category_counts[category_id] = self._category_counts.get(category_id, 0) + change
+            names = self._categories_in_use()
+        if names != before:
+            self._notify_categories(names)
+
+    def add_category_listener(self, callback):
+        """Call callback(names) whenever the set of categories that have entries changes.
+
+        names is the sorted list get_all_categories() returns. The callback
+        runs on the thread that made the change.
+        """
+        with self._lock:
+            self._category_listeners.append(callback)
+
+    def remove_category_listener(self, callback):
+        with self._lock:
+            if callback in self._category_listeners:
+                self._category_listeners.remove(callback)
+
+    def _notify_categories(self, names):
+        with self._lock:
+            listeners = list(self._category_listeners)
+        for callback in listeners:
+            callback(list(names))
+
+    def sync_categories(self):
+        """Pick up category changes committed through other connections (e.g. a background import).
+
+        Costs one PRAGMA when nothing changed; otherwise the categories are
+        re-read and listeners notified if the set in use changed.
+        """
+        with self._lock:
+            if self._category_ids is None:
+                self._load_categories()
+                return
+            if self.conn.execute('PRAGMA data_version').fetchone()[0] == self._category_version:
+                return
+        self._count_categories(None)
+
+    @instrument('db.add_entry')
     def add_entry(self, entry_data):
-        """Add a new entry to the database."""
+        """Add a new entry to the database and return its id."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._category_write() as cursor:
+                category_id = self.category_ids(cursor, [entry_data['category']])[entry_data['category']]
                 cursor.execute('''
-                    INSERT INTO entries (date, type, category, amount, note, created_at)
+                    INSERT INTO entries (date, type, category_id, amount, note, created_at)
                     VALUES (?, ?, ?, ?, ?, ?)
-                ''', (entry_data['date'], entry_data['type'], entry_data['category'], entry_data['amount'], entry_data['note'], datetime.now()))
-                conn.commit()
+                ''', (to_iso_date(entry_data['date']), entry_data['type'], category_id, entry_data['amount'], entry_data['note'], datetime.now()))
+                self.invalidate_cache()
+                entry_id = cursor.lastrowid
         except sqlite3.Error as e:
             print(f"Error adding entry: {e}")
+            return None
+        self._count_categories({category_id: 1})
+        return entry_id
 
 
-    def get_all_entries(self):
-        """Retrieve all entries from the database."""
+    @instrument('db.add_entries_bulk')
+    def add_entries_bulk(self, entries, checkpoint=None):
+        """Insert many validated entries in one transaction and return how many were new.
+
+        Each entry dict may carry an 'import_key'; rows whose key already
+        exists are skipped, which makes re-importing the same file a no-op.
+        checkpoint, if given, is a (source, size, mtime, line, imported_before)
+        tuple saved in the same transaction (with this batch's new rows added to
+        imported_before) so an interrupted import can resume.
+        """
+        now = datetime.now()
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT * FROM entries')
-                return cursor.fetchall()
+            with self._category_write() as cursor:
+                ids = self.category_ids(cursor, [e['category'] for e in entries])
+                rows = [(e['date'], e['type'], ids[e['category']], e['amount'], e['note'], now, e.get('import_key'))
+                        for e in entries]
+                # Inserting in date order keeps the date-leading indexes' page writes local
+                rows.sort(key=lambda row: row[0])
+                cursor.executemany('''
+                    INSERT OR IGNORE INTO entries (date, type, category_id, amount, note, created_at, import_key)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+                inserted = cursor.rowcount
+                self.invalidate_cache()
+                if checkpoint is not None:
+                    source, size, mtime, line, imported_before = checkpoint
+                    cursor.execute('''
+                        INSERT OR REPLACE INTO import_checkpoints (source, size, mtime, line, imported)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', (source, size, mtime, line, imported_before + inserted))
         except sqlite3.Error as e:
-            print(f"Error retrieving entries: {e}")
-            return []
+            print(f"Error adding entries: {e}")
+            raise
+        if inserted == len(rows):
+            changes = {}
+            for row in rows:
+                changes[row[2]] = changes.get(row[2], 0) + 1
+            self._count_categories(changes)
+        else:
+            # Some rows were already imported, so the per-category counts are re-read
+            self._count_categories(None)
+        return inserted
+
+    def get_import_checkpoint(self, source):
+        """Return (size, mtime, line, imported) saved for an import source, or None."""
+        try:
+            with self._lock:
+                cursor = self.conn.cursor()
+                cursor.execute('SELECT size, mtime, line, imported FROM import_checkpoints WHERE source=?', (source,))
+                return cursor.fetchone()
+        except sqlite3.Error as e:
+            print(f"Error retrieving import checkpoint: {e}")
+            return None
+
+    def clear_import_checkpoint(self, source):
+        """Forget the checkpoint of a finished import."""
+        try:
+            with self._lock, self.conn:
+                self.conn.execute('DELETE FROM import_checkpoints WHERE source=?', (source,))
+        except sqlite3.Error as e:
+            print(f"Error clearing import checkpoint: {e}")
+
+    @instrument('db.get_all_entries')
+    def get_all_entries(self):
+        """Retrieve all entries from the database, newest first."""
+        return self.get_filtered_entries()
 
+    @instrument('db.get_totals')
     def get_totals(self):
-        """Calculate total income, total expenses, and balance."""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT SUM(amount) FROM entries WHERE type = "Income"')
-                total_income = cursor.fetchone()[0] or 0.0
-                cursor.execute('SELECT SUM(amount) FROM entries WHERE type = "Expense"')
-                total_expense = cursor.fetchone()[0] or 0.0
+        """Return total income, total expenses, balance (all in cents) and entry count.
+
+        Read from entry_totals, so the cost does not grow with the table.
+        """
+        try:
+            with self._lock:
+                cursor = self.conn.cursor()
+                cursor.execute(CACHED_TOTALS_QUERY)
+                total_income, total_expense, count = cursor.fetchone()
                 balance = total_income - total_expense
-                return total_income, total_expense, balance
+                return total_income, total_expense, balance, count
         except sqlite3.Error as e:
+            if is_interrupted(e):
+                raise
             print(f"Error calculating totals: {e}")
-            return 0.0, 0.0, 0.0
-        
+            return 0, 0, 0, 0
+
+    def verify_totals(self, repair=True):
+        """Compare entry_totals with a full recount and optionally rebuild it.
+
+        Returns True when the cached totals matched the entries table.
+        """
+        try:
+            with self._lock, self.conn:
+                cursor = self.conn.cursor()
+                cached = dict((row[0], row[1:]) for row in cursor.execute(
+                    'SELECT type, total, count FROM entry_totals WHERE count != 0'))
+                actual = dict((row[0], row[1:]) for row in cursor.execute(
+                    'SELECT type, SUM(amount), COUNT(*) FROM entries GROUP BY type'))
+                consistent = cached == actual
+                if not consistent and repair:
+                    _rebuild_entry_totals(cursor)
+                return consistent
+        except sqlite3.Error as e:
+            print(f"Error verifying totals: {e}")
+            return False
+
+    def rebuild_summaries(self):
+        """Recompute the trigger-maintained entry_totals, monthly_rollup and entries_fts from entries.
+
+        Returns True on success, False if the rebuild was rolled back.
+        """
+        try:
+            with self._lock, self.conn:
+                cursor = self.conn.cursor()
+                _rebuild_entry_totals(cursor)
+                _rebuild_monthly_rollup(cursor)
+                _rebuild_search_index(cursor)
+                self.invalidate_cache()
+        except sqlite3.Error as e:
+            print(f"Error rebuilding summaries: {e}")
+            return False
+        # The category counts come from monthly_rollup
+        self._count_categories(None)
+        return True
+
+    @instrument('db.update_entry')
     def update_entry(self, entry_id, entry_data):
         """Update an existing entry in the database."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._category_write() as cursor:
+                category_id = self.category_ids(cursor, [entry_data['category']])[entry_data['category']]
+                old = cursor.execute('SELECT category_id FROM entries WHERE id=?', (entry_id,)).fetchone()
                 cursor.execute('''
-                    UPDATE entries 
-                    SET date=?, type=?, category=?, amount=?, note=?
+                    UPDATE entries
+                    SET date=?, type=?, category_id=?, amount=?, note=?
                     WHERE id=?
-                ''', (entry_data['date'], entry_data['type'], entry_data['category'], 
+                ''', (to_iso_date(entry_data['date']), entry_data['type'], category_id,
                      entry_data['amount'], entry_data['note'], entry_id))
-                conn.commit()
+                self.invalidate_cache()
         except sqlite3.Error as e:
             print(f"Error updating entry: {e}")
+            return
+        if old is not None and old[0] != category_id:
+            self._count_categories({old[0]: -1, category_id: 1})
 
+    @instrument('db.delete_entry')
     def delete_entry(self, entry_id):
         """Delete an entry from the database."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self._lock, self.conn:
+                cursor = self.conn.cursor()
+                old = cursor.execute('SELECT category_id FROM entries WHERE id=?', (entry_id,)).fetchone()
                 cursor.execute('DELETE FROM entries WHERE id=?', (entry_id,))
-                conn.commit()
+                self.invalidate_cache()
         except sqlite3.Error as e:
             print(f"Error deleting entry: {e}")
+            return
+        if old is not None:
+            self._count_categories({old[0]: -1})
 
+    @instrument('db.get_entry_by_id')
     def get_entry_by_id(self, entry_id):
         """Get a single entry by ID."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT * FROM entries WHERE id=?', (entry_id,))
+            with self._lock:
+                cursor = self.conn.cursor()
+                cursor.execute(ENTRY_SELECT + ' WHERE id=?', (entry_id,))
                 return cursor.fetchone()
         except sqlite3.Error as e:
+            if is_interrupted(e):
+                raise
             print(f"Error retrieving entry: {e}")
             return None
-        
-    def get_filtered_entries(self, from_date=None, to_date=None, category=None, entry_type=None):
-        """Retrieve filtered entries from the database."""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                query = "SELECT * FROM entries WHERE 1=1"
-                params = []
-                
-                # Add date range filter - now properly handles DateEntry format
-                if from_date:
-                    query += " AND date >= ?"
-                    params.append(from_date)
-                
-                if to_date:
-                    query += " AND date <= ?"
-                    params.append(to_date)
-                
-                # Add category filter - handle "Other" specially
-                if category and category != "All":
-                    if category == "Other":
-                        # Filter for categories that are NOT in the predefined list
-                        query += " AND category NOT IN ('Food', 'Transport', 'Utilities', 'Entertainment')"
-                    else:
-                        # Use LIKE for exact match (case-insensitive)
-                        query += " AND LOWER(category) = LOWER(?)"
-                        params.append(category)
-                
-                # Add type filter
-                if entry_type and entry_type != "All":
-                    query += " AND type = ?"
-                    params.append(entry_type)
-                
-                query += " ORDER BY date DESC"
-                
-                print(f"Debug - Filter Query: {query}")  # Debug line
-                print(f"Debug - Filter Params: {params}")  # Debug line
-                
-                cursor.execute(query, params)
-                results = cursor.fetchall()
-                print(f"Debug - Found {len(results)} entries")  # Debug line
-                return results
-                
+
+    def build_filter_conditions(self, from_date=None, to_date=None, category=None, entry_type=None, search=None):
+        """Build the WHERE conditions and parameters shared by the filtered queries."""
+        conditions = []
+        params = []
+
+        # Add date range filter - ISO dates compare chronologically
+        if from_date:
+            conditions.append("date >= ?")
+            params.append(to_iso_date(from_date))
+
+        if to_date:
+            conditions.append("date <= ?")
+            params.append(to_iso_date(to_date))
+
+        # Add category filter - handle "Other" specially
+        if category and category != "All":
+            if category == "Other":
+                # Filter for categories that are not built in
+                conditions.append("category_id NOT IN (SELECT id FROM categories WHERE is_builtin)")
+            else:
+                # The id is looked up once; the match itself seeks on idx_entries_category_date
+                conditions.append("category_id = (SELECT id FROM categories WHERE name_key = ?)")
+                params.append(category_key(category))
+
+        # Add type filter
+        if entry_type and entry_type != "All":
+            conditions.append("type = ?")
+            params.append(entry_type)
+
+        # Search: every word must start a word of the note or the category name
+        if search_terms(search):
+            if self.full_text_search:
+                conditions.append("id IN (SELECT rowid FROM entries_fts WHERE entries_fts MATCH ?)")
+                params.append(fts_query(search))
+            else:
+                for word in search_terms(search):
+                    conditions.append(f"(note LIKE ? OR {CATEGORY_NAME} LIKE ?)")
+                    params.extend([f"%{word}%"] * 2)
+
+        return conditions, params
+
+    @instrument('db.get_filtered_entries')
+    def get_filtered_entries(self, from_date=None, to_date=None, category=None, entry_type=None,
+                             search=None, limit=None):
+        """Retrieve filtered entries from the database, newest first.
+
+        With a search, the best matches (by FTS5 bm25 rank) come first.
+        limit caps the number of rows returned. Results are cached until
+        the next write, so switching back to a filter combination seen
+        before does not run the query again.
+        """
+        try:
+            with self._lock:
+                key = ('entries',) + self.filter_key(from_date, to_date, category, entry_type, search) + (limit,)
+                results = self._cache_get(key)
+                if results is None:
+                    cursor = self.conn.cursor()
+
+                    ranked = self.full_text_search and bool(search_terms(search))
+                    conditions, params = self.build_filter_conditions(from_date, to_date, category, entry_type,
+                                                                      None if ranked else search)
+                    query = ENTRY_SELECT
+                    if ranked:
+                        # Joined rather than filtered with IN so the rank can order the rows
+                        query += (" JOIN (SELECT rowid AS match_id, rank AS match_rank FROM entries_fts"
+                                  " WHERE entries_fts MATCH ?) ON match_id = id")
+                        params.insert(0, fts_query(search))
+                    if conditions:
+                        query += " WHERE " + " AND ".join(conditions)
+                    query += " ORDER BY match_rank, date DESC, id DESC" if ranked else " ORDER BY date DESC, id DESC"
+                    if limit is not None:
+                        query += " LIMIT ?"
+                        params.append(limit)
+
+                    cursor.execute(query, params)
+                    results = cursor.fetchall()
+                    self._cache_put(key, results)
+                # A copy, so callers cannot change the cached list
+                return list(results)
+
         except sqlite3.Error as e:
+            if is_interrupted(e):
+                raise
             print(f"Error retrieving filtered entries: {e}")
             return []
 
-    def get_filtered_totals(self, from_date=None, to_date=None, category=None, entry_type=None):
-        """Calculate totals for filtered data."""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                base_query = "SELECT SUM(amount) FROM entries WHERE 1=1"
-                params = []
-                
-                # Add filters - now properly handles DateEntry format
-                if from_date:
-                    base_query += " AND date >= ?"
-                    params.append(from_date)
-                
-                if to_date:
-                    base_query += " AND date <= ?"
-                    params.append(to_date)
-                
-                # Add category filter - handle "Other" specially
-                if category and category != "All":
-                    if category == "Other":
-                        # Filter for categories that are NOT in the predefined list
-                        base_query += " AND category NOT IN ('Food', 'Transport', 'Utilities', 'Entertainment')"
-                    else:
-                        base_query += " AND LOWER(category) = LOWER(?)"
-                        params.append(category)
-                
-                # Calculate income
-                income_query = base_query + " AND type = 'Income'"
-                income_params = params.copy()
-                if entry_type and entry_type == "Expense":
-                    total_income = 0.0
-                else:
-                    cursor.execute(income_query, income_params)
-                    total_income = cursor.fetchone()[0] or 0.0
-                
-                # Calculate expenses
-                expense_query = base_query + " AND type = 'Expense'"
-                expense_params = params.copy()
-                if entry_type and entry_type == "Income":
-                    total_expense = 0.0
-                else:
-                    cursor.execute(expense_query, expense_params)
-                    total_expense = cursor.fetchone()[0] or 0.0
-                
-                balance = total_income - total_expense
-                return total_income, total_expense, balance
-                
+    @instrument('db.get_filtered_totals')
+    def get_filtered_totals(self, from_date=None, to_date=None, category=None, entry_type=None, search=None):
+        """Calculate income, expenses, balance and entry count for filtered data.
+
+        Whole months come from monthly_rollup and only the partial months at
+        either end of the date range are summed from entries (a search
+        reads the matching entries instead). Results are cached like
+        get_filtered_entries.
+        """
+        try:
+            with self._lock:
+                key = ('totals',) + self.filter_key(from_date, to_date, category, entry_type, search)
+                totals = self._cache_get(key)
+                if totals is None:
+                    total_income = total_expense = 0
+                    count = 0
+                    for query, params in self.period_queries(ROLLUP_TOTALS_QUERY, TOTALS_QUERY, *key[1:]):
+                        income, expense, rows = self.conn.execute(query, params).fetchone()
+                        total_income += income
+                        total_expense += expense
+                        count += rows
+                    totals = (total_income, total_expense, total_income - total_expense, count)
+                    self._cache_put(key, totals)
+                return totals
+
         except sqlite3.Error as e:
+            if is_interrupted(e):
+                raise
             print(f"Error calculating filtered totals: {e}")
-            return 0.0, 0.0, 0.0
+            return 0, 0, 0, 0
+
+    def period_queries(self, rollup_query, entry_query, from_date=None, to_date=None,
+                       category=None, entry_type=None, search=None, suffix=""):
+        """Return the (query, params) pairs that together cover a filtered date range.
+
+        rollup_query reads monthly_rollup and answers the whole months;
+        entry_query reads entries for each partial-month edge. Both get the
+        category/type filters as a WHERE clause, followed by suffix.
+        """
+        if search_terms(search):
+            # monthly_rollup knows nothing about notes: read the matching entries
+            conditions, params = self.build_filter_conditions(from_date, to_date, category, entry_type, search)
+            return [(entry_query + " WHERE " + " AND ".join(conditions) + suffix, params)]
+        months, edges = split_period(to_iso_date(from_date) or None, to_iso_date(to_date) or None)
+        queries = []
+        if months is not None:
+            first, last = months
+            conditions, params = [], []
+            if first:
+                conditions.append("month >= ?")
+                params.append(first)
+            if last:
+                conditions.append("month <= ?")
+                params.append(last)
+            filter_conditions, filter_params = self.build_filter_conditions(None, None, category, entry_type)
+            conditions += filter_conditions
+            params += filter_params
+            where = " WHERE " + " AND ".join(conditions) if conditions else ""
+            queries.append((rollup_query + where + suffix, params))
+        for edge_from, edge_to in edges:
+            conditions, params = self.build_filter_conditions(edge_from, edge_to, category, entry_type)
+            queries.append((entry_query + " WHERE " + " AND ".join(conditions) + suffix, params))
+        return queries
+
+    @instrument('db.get_period_summary')
+    def get_period_summary(self, from_date=None, to_date=None, category=None, entry_type=None, search=None):
+        """Return (category, type, total, count, min, max) rows for a period, amounts in cents.
+
+        Answered like get_filtered_totals: whole months from monthly_rollup
+        plus at most two partial-month scans of entries.
+        """
+        try:
+            with self._lock:
+                key = ('summary',) + self.filter_key(from_date, to_date, category, entry_type, search)
+                summary = self._cache_get(key)
+                if summary is None:
+                    groups = {}
+                    for query, params in self.period_queries(ROLLUP_SUMMARY_QUERY, ENTRY_SUMMARY_QUERY, *key[1:],
+                                                         suffix=" GROUP BY category_id, type"):
+                        for group_category, group_type, total, count, low, high in self.conn.execute(query, params):
+                            group = groups.get((group_category, group_type))
+                            if group is None:
+                                groups[(group_category, group_type)] = [total, count, low, high]
+                            else:
+                                group[0] += total
+                                group[1] += count
+                                group[2] = min(group[2], low)
+                                group[3] = max(group[3], high)
+                    summary = [(group_category, group_type, *figures)
+                               for (group_category, group_type), figures in sorted(groups.items())]
+                    self._cache_put(key, summary)
+                return list(summary)
+        except sqlite3.Error as e:
+            if is_interrupted(e):
+                raise
+            print(f"Error calculating period summary: {e}")
+            return []
+
+    @instrument('db.get_entries_page')
+    def get_entries_page(self, limit, older_than=None, newer_than=None, offset=0, from_oldest=False,
+                         from_date=None, to_date=None, category=None, entry_type=None, search=None):
+        """Retrieve one page of entries, newest first, using keyset pagination on (date, id).
+
+        older_than / newer_than take the (date, id) key of an entry already on
+        screen and return the rows right after / right before it, which is an
+        index seek no matter how deep the page is. offset is only meant for
+        jumps (e.g. dragging the scrollbar) where no neighbouring key is known.
+        With from_oldest, offset counts from the oldest entry instead, so a
+        jump near the end skips few rows; the page is still newest first.
+        """
+        try:
+            with self._lock:
+                cursor = self.conn.cursor()
+
+                conditions, params = self.build_filter_conditions(from_date, to_date, category, entry_type, search)
+                order = "DESC"
+                if older_than is not None:
+                    conditions.append("(date, id) < (?, ?)")
+                    params.extend(older_than)
+                elif newer_than is not None:
+                    conditions.append("(date, id) > (?, ?)")
+                    params.extend(newer_than)
+                    order = "ASC"
+                elif from_oldest:
+                    order = "ASC"
+
+                query = ENTRY_SELECT
+                if conditions:
+                    query += " WHERE " + " AND ".join(conditions)
+                query += f" ORDER BY date {order}, id {order} LIMIT ? OFFSET ?"
+                params.extend([limit, offset if older_than is None and newer_than is None else 0])
+
+                cursor.execute(query, params)
+                rows = cursor.fetchall()
+                if order == "ASC":
+                    rows.reverse()
+                return rows
+        except sqlite3.Error as e:
+            if is_interrupted(e):
+                raise
+            print(f"Error retrieving entries page: {e}")
+            return []
+
+    def iter_entry_batches(self, batch_size=1000, from_date=None, to_date=None, category=None, entry_type=None,
+                           search=None):
+        """Yield filtered entries, newest first, in lists of at most batch_size rows.
+
+        Rows are pulled from the cursor with fetchmany, so memory use does not
+        depend on the table size. The connection lock is held until the
+        generator is exhausted or closed, so use a dedicated helper (e.g. one
+        owned by a worker thread) for long iterations.
+        """
+        conditions, params = self.build_filter_conditions(from_date, to_date, category, entry_type, search)
+        query = ENTRY_SELECT
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY date DESC, id DESC"
+
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute(query, params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                cursor.close()
+
+    def check_query_plans(self):
+        """Return (query, plan step) pairs for hot filter queries that scan the whole entries table.
+
+        An empty list means every filter combination the UI can produce is
+        answered by an index seek or a covering-index scan.
+        """
+        date_ranges = [("2024-01-01", "2024-12-31"), ("2024-01-01", None), (None, None)]
+        categories = [None, "Food", "Other"]
+        types = [None, "Income", "Expense"]
 
+        offenders = []
+        with self._lock:
+            cursor = self.conn.cursor()
+            for from_date, to_date in date_ranges:
+                for category in categories:
+                    for entry_type in types:
+                        if not (from_date or to_date or entry_type) and category in (None, "Other"):
+                            # Nothing selective to seek on; these read every row by definition
+                            continue
+                        conditions, params = self.build_filter_conditions(from_date, to_date, category, entry_type)
+                        where = " WHERE " + " AND ".join(conditions)
+                        queries = [
+                            (ENTRY_SELECT + where + " ORDER BY date DESC, id DESC", params),
+                            (TOTALS_QUERY + where, params),
+                        ]
+                        for query, query_params in queries:
+                            cursor.execute("EXPLAIN QUERY PLAN " + query, query_params)
+                            for row in cursor.fetchall():
+                                if is_full_scan(row[3]):
+                                    offenders.append((query, row[3]))
+
+        return offenders
+
+    def get_matching_ids(self, search):
+        """Return the ids of the entries whose note or category name match search."""
+        try:
+            with self._lock:
+                conditions, params = self.build_filter_conditions(search=search)
+                if not conditions:
+                    return []
+                return [row[0] for row in self.conn.execute(
+                    "SELECT id FROM entries WHERE " + " AND ".join(conditions), params)]
+        except sqlite3.Error as e:
+            if is_interrupted(e):
+                raise
+            print(f"Error searching entries: {e}")
+            return []
+
+    def get_change_marker(self):
+        """Return (revision, max id): revision changes on every update or delete of an entry."""
+        try:
+            with self._lock:
+                return self.conn.execute('''
+                    SELECT (SELECT revision FROM entry_revision), COALESCE((SELECT MAX(id) FROM entries), 0)
+                ''').fetchone()
+        except sqlite3.Error as e:
+            if is_interrupted(e):
+                raise
+            print(f"Error reading change marker: {e}")
+            return None
+
+    @instrument('db.get_column_rows')
+    def get_column_rows(self, after_id=0):
+        """Return (id, day, is_income, category, cents) for entries with id > after_id, by id.
+
+        day counts days since 1970-01-01 and cents is the amount in whole
+        cents, ready to load into NumPy arrays (see analytics.EntryColumns).
+        Returns None if the rows could not be read.
+        """
+        try:
+            with self._lock:
+                return self.conn.execute(f'''
+                    SELECT id, CAST(julianday(date) - 2440587.5 AS INTEGER), type = 'Income', {CATEGORY_NAME},
+                           amount
+                    FROM entries WHERE id > ? ORDER BY id
+                ''', (after_id,)).fetchall()
+        except sqlite3.Error as e:
+            if is_interrupted(e):
+                raise
+            print(f"Error retrieving entry columns: {e}")
+            return None
+
+    @instrument('db.get_all_categories')
     def get_all_categories(self):
-        """Get all unique categories from the database."""
+        """Get the names of all categories that have entries, sorted.
+
+        Served from the in-memory category counts; the database is only
+        read again after another connection has committed changes.
+        """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT DISTINCT category FROM entries ORDER BY category')
-                categories = [row[0] for row in cursor.fetchall()]
-                return categories
+            self.sync_categories()
+            with self._lock:
+                return self._categories_in_use()
         except sqlite3.Error as e:
+            if is_interrupted(e):
+                raise
             print(f"Error retrieving categories: {e}")
             return []
 
-db = ExpenseDBHelper()
\ No newline at end of file
+db = ExpenseDBHelper()
+
+
+if __name__ == "__main__":
+    # Maintenance: python db_helper.py rebuild-summaries [database path]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Expense database maintenance")
+    parser.add_argument("command", choices=["rebuild-summaries"])
+    parser.add_argument("path", nargs="?", help="database file (default: data/expenses.db)")
+    args = parser.parse_args()
+
+    target = db if args.path is None else ExpenseDBHelper(args.path)
+    if not target.rebuild_summaries():
+        sys.exit(1)
+    print(f"Rebuilt entry_totals, monthly_rollup and entries_fts in {target.db_path}")
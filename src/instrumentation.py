@@ -0,0 +1,196 @@
+"""Opt-in timing of the database and UI hot paths.
+
+Set EXPENSE_TRACKER_METRICS before starting the app to turn it on:
+
+    EXPENSE_TRACKER_METRICS=1                    record in memory only
+    EXPENSE_TRACKER_METRICS=metrics.json         also write a JSON report on exit
+    EXPENSE_TRACKER_METRICS=metrics.prom         ... or Prometheus text format
+
+Every instrumented call records its latency, the number of rows it
+returned and the SQL it ran. The most recent calls are kept in a ring
+buffer, and each operation keeps a rolling window of latencies for its
+histogram and percentiles. When the variable is not set, instrument()
+returns the function unchanged, so there is no cost at all.
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+_setting = os.environ.get('EXPENSE_TRACKER_METRICS', '')
+ENABLED = _setting not in ('', '0')
+REPORT_PATH = _setting if ENABLED and _setting != '1' else None
+
+# Most recent calls kept with their SQL text
+RING_SIZE = 2000
+# Latencies per operation behind the rolling histogram and percentiles
+WINDOW_SIZE = 1000
+# Statements remembered per call (executemany traces every row)
+MAX_STATEMENTS = 16
+# Histogram bucket upper bounds in milliseconds
+BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Metrics:
+    """Thread-safe store for recorded calls."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.recent = deque(maxlen=RING_SIZE)
+            self.windows = {}   # op -> deque of recent latencies (ms)
+            self.totals = {}    # op -> [calls, sum_ms, rows, bucket counts]
+
+    def record(self, op, ms, rows=None, sql=None):
+        event = {
+            'op': op,
+            'at': time.time(),
+            'ms': round(ms, 3),
+            'rows': rows,
+            'sql': sql,
+            'thread': threading.current_thread().name,
+        }
+        with self._lock:
+            self.recent.append(event)
+            window = self.windows.get(op)
+            if window is None:
+                window = self.windows[op] = deque(maxlen=WINDOW_SIZE)
+                self.totals[op] = [0, 0.0, 0, [0] * (len(BUCKETS_MS) + 1)]
+            window.append(ms)
+            totals = self.totals[op]
+            totals[0] += 1
+            totals[1] += ms
+            totals[2] += rows or 0
+            totals[3][_bucket(ms)] += 1
+
+    def snapshot(self):
+        """Return every operation's statistics and the recent calls as plain data."""
+        with self._lock:
+            windows = {op: sorted(window) for op, window in self.windows.items()}
+            totals = {op: (calls, sum_ms, rows) for op, (calls, sum_ms, rows, _) in self.totals.items()}
+            recent = list(self.recent)
+
+        operations = {}
+        for op, latencies in sorted(windows.items()):
+            calls, sum_ms, rows = totals[op]
+            counts = [0] * (len(BUCKETS_MS) + 1)
+            for ms in latencies:
+                counts[_bucket(ms)] += 1
+            operations[op] = {
+                'calls': calls,
+                'total_ms': round(sum_ms, 3),
+                'rows': rows,
+                'window': {
+                    'calls': len(latencies),
+                    'p50_ms': round(_percentile(latencies, 0.50), 3),
+                    'p95_ms': round(_percentile(latencies, 0.95), 3),
+                    'p99_ms': round(_percentile(latencies, 0.99), 3),
+                    'max_ms': round(latencies[-1], 3),
+                    'histogram': dict(zip([str(b) for b in BUCKETS_MS] + ['+Inf'], counts)),
+                },
+            }
+        return {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'operations': operations,
+            'recent': recent,
+        }
+
+    def to_prometheus(self):
+        """Return the lifetime totals in the Prometheus text exposition format."""
+        with self._lock:
+            totals = {op: (calls, sum_ms, rows, list(counts))
+                      for op, (calls, sum_ms, rows, counts) in self.totals.items()}
+
+        lines = [
+            '# HELP expense_tracker_call_duration_seconds Latency of instrumented calls.',
+            '# TYPE expense_tracker_call_duration_seconds histogram',
+        ]
+        for op, (calls, sum_ms, rows, counts) in sorted(totals.items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS_MS, counts):
+                cumulative += count
+                lines.append(f'expense_tracker_call_duration_seconds_bucket{{op="{op}",le="{bound / 1000:g}"}} {cumulative}')
+            lines.append(f'expense_tracker_call_duration_seconds_bucket{{op="{op}",le="+Inf"}} {calls}')
+            lines.append(f'expense_tracker_call_duration_seconds_sum{{op="{op}"}} {sum_ms / 1000:.6f}')
+            lines.append(f'expense_tracker_call_duration_seconds_count{{op="{op}"}} {calls}')
+        lines.append('# HELP expense_tracker_rows_returned_total Rows returned by instrumented calls.')
+        lines.append('# TYPE expense_tracker_rows_returned_total counter')
+        for op, (calls, sum_ms, rows, counts) in sorted(totals.items()):
+            lines.append(f'expense_tracker_rows_returned_total{{op="{op}"}} {rows}')
+        return '\n'.join(lines) + '\n'
+
+    def write_report(self, path):
+        """Write a Prometheus (.prom/.txt) or JSON (anything else) report to path."""
+        if path.endswith(('.prom', '.txt')):
+            text = self.to_prometheus()
+        else:
+            text = json.dumps(self.snapshot(), indent=2)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+def _bucket(ms):
+    for index, bound in enumerate(BUCKETS_MS):
+        if ms <= bound:
+            return index
+    return len(BUCKETS_MS)
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+metrics = Metrics()
+
+# SQL traced on each thread since the innermost instrumented call started
+_traced = threading.local()
+
+
+def _trace_statement(sql):
+    statements = getattr(_traced, 'statements', None)
+    if statements is not None and len(statements) < MAX_STATEMENTS:
+        statements.append(sql)
+
+
+def trace_sql(conn):
+    """Capture the SQL run on conn for instrumented calls (no-op when disabled)."""
+    if ENABLED:
+        conn.set_trace_callback(_trace_statement)
+
+
+def instrument(op):
+    """Decorator recording latency, rows returned and SQL of every call as op.
+
+    The row count is len(result) for list results and empty otherwise.
+    """
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            outer = getattr(_traced, 'statements', None)
+            _traced.statements = statements = []
+            start = time.perf_counter()
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                return result
+            finally:
+                ms = (time.perf_counter() - start) * 1000
+                _traced.statements = outer
+                rows = len(result) if isinstance(result, list) else None
+                metrics.record(op, ms, rows, '; '.join(statements) or None)
+        return wrapper
+    return decorate
+
+
+if REPORT_PATH:
+    atexit.register(lambda: metrics.write_report(REPORT_PATH))
@@ -0,0 +1,61 @@
+"""Amounts are stored and summed as integer cents; these helpers convert at the edges."""
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
+
+# Largest amount SQLite can store in an INTEGER column
+MAX_CENTS = 2 ** 63 - 1
+
+
+def parse_cents(value):
+    """Convert an amount such as '12.5', 12.5 or Decimal('12.50') to integer cents.
+
+    More than two decimals are rounded half up. Raises ValueError for
+    anything that is not a finite number or does not fit in MAX_CENTS.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"not an amount: {value!r}")
+    if isinstance(value, int):
+        return _checked(value * 100, value)
+    if isinstance(value, float):
+        value = repr(value)  # the shortest decimal that round-trips, e.g. 0.1 -> '0.1'
+    text = str(value).strip()
+
+    # Fast path for plain '123' / '123.4' / '123.45' (bulk imports)
+    whole, dot, fraction = text.partition('.')
+    if whole.isascii() and whole.isdigit() and (not fraction or (fraction.isascii() and fraction.isdigit()
+                                                                 and len(fraction) <= 2)):
+        return _checked(int(whole) * 100 + int(fraction.ljust(2, '0') or 0), value)
+
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"not an amount: {value!r}")
+    if not amount.is_finite():
+        raise ValueError(f"not an amount: {value!r}")
+    if amount.copy_abs() > Decimal(MAX_CENTS).scaleb(-2):
+        # Compared exactly, before int(), so '1e999999999' is not expanded digit by digit
+        raise ValueError(f"amount too large: {value!r}")
+    return _checked(int((amount * 100).to_integral_value(ROUND_HALF_UP)), value)
+
+
+def _checked(cents, value):
+    if abs(cents) > MAX_CENTS:
+        raise ValueError(f"amount too large: {value!r}")
+    return cents
+
+
+def cents_to_str(cents):
+    """Plain decimal text for an amount in cents, e.g. 123450 -> '1234.50' (CSV and edit fields)."""
+    sign = '-' if cents < 0 else ''
+    whole, part = divmod(abs(cents), 100)
+    return f"{sign}{whole}.{part:02d}"
+
+
+@lru_cache(maxsize=8192)
+def format_cents(cents):
+    """Display text for an amount in cents, e.g. 123450 -> '$1234.50'.
+
+    Cached because the table formats the same few thousand amounts over
+    and over while scrolling and refreshing.
+    """
+    return f"${cents_to_str(cents)}"
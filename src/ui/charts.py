@@ -0,0 +1,165 @@
+# Charts dashboard: balance over time, spend by category, monthly income vs expense
+import tkinter as tk
+
+import numpy as np
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.dates import AutoDateLocator, ConciseDateFormatter, date2num
+from matplotlib.figure import Figure
+from matplotlib.ticker import MaxNLocator, StrMethodFormatter
+
+from analytics import EntryColumns
+from styles import AppStyles
+
+# Points plotted for the balance line; longer series are downsampled
+MAX_POINTS = 800
+# Expense categories shown individually; the rest are summed into one bar
+TOP_CATEGORIES = 8
+# Quiet period before a requested refresh actually runs (ms)
+REFRESH_DELAY = 250
+
+
+def downsample(x, y, max_points=MAX_POINTS):
+    """Reduce a series to about max_points, keeping each bucket's min and max so peaks survive."""
+    count = len(x)
+    if count <= max_points:
+        return x, y
+    buckets = max_points // 2
+    size = -(-count // buckets)  # ceil
+    padded = np.pad(y, (0, buckets * size - count), mode="edge").reshape(buckets, size)
+    base = np.arange(buckets) * size
+    keep = np.concatenate([base + padded.argmin(axis=1), base + padded.argmax(axis=1), [0, count - 1]])
+    keep = np.unique(np.minimum(keep, count - 1))
+    return x[keep], y[keep]
+
+
+def chart_series(columns, filters):
+    """Compute everything the charts plot, already aggregated and downsampled.
+
+    Runs on the query worker thread; the result only holds small arrays.
+    """
+    filters = dict(filters or {})
+    filters.pop("entry_type", None)  # each chart picks its own types
+
+    days, balance = columns.cumulative_balance(**filters)
+    balance_x, balance_y = downsample(date2num(days), balance / 100.0)
+
+    categories = columns.category_totals(entry_type="Expense", **filters)
+    top = categories[:TOP_CATEGORIES]
+    rest = sum(total for name, total, count in categories[TOP_CATEGORIES:])
+    category_names = [name for name, total, count in top] + (["All others"] if rest else [])
+    category_totals = np.array([total for name, total, count in top] + ([rest] if rest else []), dtype=float) / 100.0
+
+    income_months, income = columns.monthly_totals(entry_type="Income", **filters)
+    expense_months, expense = columns.monthly_totals(entry_type="Expense", **filters)
+    return {
+        "balance": (balance_x, balance_y),
+        "categories": (category_names, category_totals),
+        "income": (date2num(income_months.astype("datetime64[D]")), income / 100.0),
+        "expense": (date2num(expense_months.astype("datetime64[D]")), expense / 100.0),
+    }
+
+
+class ChartsPanel(tk.Frame):
+    """Matplotlib charts embedded with FigureCanvasTkAgg.
+
+    The figure and its artists are created once; refreshes only swap their
+    data (set_data / set_width) and ask for a redraw with draw_idle. Data
+    is computed on the query worker from a cached analytics.EntryColumns
+    snapshot, and refresh requests are debounced.
+    """
+
+    def __init__(self, master, queries):
+        super().__init__(master, bg=AppStyles.BG_SECONDARY)
+        self.queries = queries
+        self.columns = None         # only used on the worker thread
+        self.filters = None
+        self.refresh_after = None
+        self.shown = False
+        self.stale = True
+
+        self.figure = Figure(figsize=(10, 5), dpi=100, facecolor=AppStyles.BG_SECONDARY)
+        grid = self.figure.add_gridspec(2, 2, height_ratios=(1, 1), width_ratios=(2, 3))
+        self.balance_axes = self.figure.add_subplot(grid[0, :])
+        self.category_axes = self.figure.add_subplot(grid[1, 0])
+        self.monthly_axes = self.figure.add_subplot(grid[1, 1], sharex=self.balance_axes)
+        self.figure.subplots_adjust(left=0.12, right=0.98, top=0.93, bottom=0.08, hspace=0.45, wspace=0.3)
+        self.create_artists()
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+
+    def create_artists(self):
+        for axes, title in ((self.balance_axes, "Balance over time"),
+                            (self.category_axes, "Spend by category"),
+                            (self.monthly_axes, "Monthly income vs expense")):
+            axes.set_title(title, fontsize=10, color=AppStyles.TEXT_PRIMARY, loc="left")
+            axes.tick_params(labelsize=8, colors=AppStyles.TEXT_SECONDARY)
+            axes.grid(True, alpha=0.3)
+        for axis in (self.balance_axes.yaxis, self.category_axes.xaxis, self.monthly_axes.yaxis):
+            axis.set_major_formatter(StrMethodFormatter("${x:,.0f}"))
+
+        locator = AutoDateLocator()
+        self.balance_axes.xaxis.set_major_locator(locator)
+        self.balance_axes.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+        self.balance_line, = self.balance_axes.plot([], [], color=AppStyles.PRIMARY_COLOR, linewidth=1.2)
+
+        slots = TOP_CATEGORIES + 1
+        self.category_bars = self.category_axes.barh(range(slots), [0] * slots, color=AppStyles.SUCCESS_COLOR)
+        self.category_axes.set_yticks(range(slots))
+        self.category_axes.xaxis.set_major_locator(MaxNLocator(4))
+        self.category_axes.invert_yaxis()
+
+        self.income_line, = self.monthly_axes.plot([], [], color=AppStyles.INCOME_COLOR, linewidth=1, label="Income")
+        self.expense_line, = self.monthly_axes.plot([], [], color=AppStyles.SUCCESS_COLOR, linewidth=1, label="Expense")
+        self.monthly_axes.legend(loc="upper left", fontsize=8, frameon=False)
+
+    def show(self, filters=None):
+        self.shown = True
+        if self.stale:
+            self.schedule_refresh(filters)
+
+    def hide(self):
+        self.shown = False
+
+    def schedule_refresh(self, filters=None):
+        """Refresh the charts for filters once no new request has come in for REFRESH_DELAY ms."""
+        self.filters = filters
+        self.stale = True
+        if not self.shown:
+            return  # picked up by show()
+        if self.refresh_after is not None:
+            self.after_cancel(self.refresh_after)
+        self.refresh_after = self.after(REFRESH_DELAY, self.refresh)
+
+    def refresh(self):
+        self.refresh_after = None
+        self.stale = False
+        filters = self.filters
+
+        def load(worker_db):
+            if self.columns is None or self.columns.db is not worker_db:
+                self.columns = EntryColumns(worker_db)
+            chart_filters = dict(filters or {})
+            search = chart_filters.pop("search", None)
+            if search:
+                chart_filters["ids"] = worker_db.get_matching_ids(search)
+            return chart_series(self.columns.refresh(), chart_filters)
+
+        self.queries.submit("charts", load, self.show_series)
+
+    def show_series(self, series):
+        self.balance_line.set_data(*series["balance"])
+
+        names, totals = series["categories"]
+        for index, bar in enumerate(self.category_bars):
+            bar.set_width(totals[index] if index < len(totals) else 0)
+        self.category_axes.set_yticklabels(names + [""] * (len(self.category_bars) - len(names)), fontsize=8)
+        self.category_axes.set_xlim(0, (totals.max() if len(totals) else 1) * 1.05)
+
+        self.income_line.set_data(*series["income"])
+        self.expense_line.set_data(*series["expense"])
+
+        for axes in (self.balance_axes, self.monthly_axes):
+            axes.relim()
+            axes.autoscale_view()
+        self.canvas.draw_idle()
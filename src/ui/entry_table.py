@@ -1,7 +1,82 @@
 # Entry Table for displaying expenses
 import tkinter as tk
+from functools import lru_cache
 from tkinter import ttk
 from styles import AppStyles
+from instrumentation import instrument
+from money import format_cents
+
+ROW_HEIGHT = 30
+# Rows fetched above and below the visible screen in virtual mode
+VIRTUAL_OVERSCAN = 20
+# Jumps that skip fewer rows than this are read directly; deeper ones in the background
+VIRTUAL_DIRECT_OFFSET = 2000
+
+
+# The display strings below are cached so every row showing the same date,
+# type or category shares one string object instead of building its own.
+
+@lru_cache(maxsize=16384)
+def format_date(iso_date):
+    """Show a stored YYYY-MM-DD date as mm-dd-yyyy."""
+    if iso_date and len(iso_date) == 10 and iso_date[4] == '-':
+        return f"{iso_date[5:7]}-{iso_date[8:10]}-{iso_date[:4]}"
+    return iso_date
+
+
+@lru_cache(maxsize=None)
+def type_label(entry_type):
+    return f"{'💰' if entry_type == 'Income' else '💸'} {entry_type}"
+
+
+@lru_cache(maxsize=4096)
+def category_label(category):
+    return f"🏷️ {category}"
+
+
+class EntryRow:
+    """What the table keeps for one shown entry: its id, Treeview values and color tag."""
+
+    __slots__ = ('entry_id', 'values', 'tag')
+
+    def __init__(self, entry_id, values, tag):
+        self.entry_id = entry_id
+        self.values = values
+        self.tag = tag
+
+    def __eq__(self, other):
+        if not isinstance(other, EntryRow):
+            return NotImplemented
+        return self.values == other.values and self.tag == other.tag
+
+    __hash__ = None
+
+
+def longest_increasing_run(values):
+    """Return the positions of one longest strictly increasing subsequence of values."""
+    tails = []      # tails[k] = position of the smallest tail of a run of length k + 1
+    previous = [-1] * len(values)
+    for position, value in enumerate(values):
+        low, high = 0, len(tails)
+        while low < high:
+            middle = (low + high) // 2
+            if values[tails[middle]] < value:
+                low = middle + 1
+            else:
+                high = middle
+        if low > 0:
+            previous[position] = tails[low - 1]
+        if low == len(tails):
+            tails.append(position)
+        else:
+            tails[low] = position
+
+    run = set()
+    position = tails[-1] if tails else -1
+    while position != -1:
+        run.add(position)
+        position = previous[position]
+    return run
 
 
 class EntryTable(tk.Frame):
@@ -9,7 +84,20 @@ class EntryTable(tk.Frame):
         super().__init__(master)
         self.master = master
         self.configure(bg=AppStyles.BG_SECONDARY)
-        self.entry_ids = {}
+        self.item_rows = {}      # item -> EntryRow currently displayed
+        self.item_order = []     # Treeview items in display order (plain mode)
+
+        # Virtual (paged) mode state - see load_virtual()
+        self.virtual = False
+        self.total_rows = 0
+        self.fetch_page = None
+        self.fetch_jump = None
+        self.jump_request = 0    # bumped per background jump; older answers are dropped
+        self.view_top = 0        # offset of the first visible row
+        self.cache_start = 0     # offset of cache_rows[0]
+        self.cache_rows = []     # fetched rows around the visible screen
+        self.row_items = []      # Treeview items reused for the visible rows
+
         self.create_widgets()
         self.configure_styles()
 
@@ -23,7 +111,7 @@ class EntryTable(tk.Frame):
                        foreground=AppStyles.TEXT_PRIMARY,
                        fieldbackground=AppStyles.BG_SECONDARY,
                        font=AppStyles.FONT_BODY,
-                       rowheight=30)
+                       rowheight=ROW_HEIGHT)
         
         # Configure headings
         style.configure('Enhanced.Treeview.Heading',
@@ -88,10 +176,27 @@ class EntryTable(tk.Frame):
         # Configure selection
         self.table.configure(selectmode="browse")
 
+        # Configure tags for row coloring
+        self.table.tag_configure('income', 
+                               background='#E8F5E8', 
+                               foreground=AppStyles.INCOME_COLOR)
+        self.table.tag_configure('expense', 
+                               background='#FFE8E8', 
+                               foreground=AppStyles.SUCCESS_COLOR)
+
+        # Only acted on in virtual mode; plain mode keeps the Treeview defaults
+        self.table.bind("<Configure>", self._on_virtual_resize, add="+")
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.table.bind(sequence, self._on_virtual_wheel, add="+")
+        for sequence in ("<Up>", "<Down>", "<Prior>", "<Next>", "<Home>", "<End>"):
+            self.table.bind(sequence, self._on_virtual_key, add="+")
+
     def clear_table(self):
-        for item in self.table.get_children():
-            self.table.delete(item)
-        self.entry_ids.clear()  # Clear the ID mapping
+        children = self.table.get_children()
+        if children:
+            self.table.delete(*children)
+        self.item_rows.clear()  # Clear the ID mapping and shown rows
+        self.item_order = []
 
     def get_selected_entry(self):
         selected = self.table.selection()
@@ -99,41 +204,297 @@ class EntryTable(tk.Frame):
             return self.table.item(selected[0])['values']
         return None
     
+    def format_entry(self, entry):
+        """Return the EntryRow (display values and color tag) for a database row."""
+        # Color code based on type
+        if entry[2] == "Income":
+            amount_color = "income"
+        else:
+            amount_color = "expense"
+
+        formatted_entry = (
+            format_date(entry[1]),  # date
+            type_label(entry[2]),  # type with emoji
+            category_label(entry[3]),  # category with emoji
+            entry[5] or "",  # note
+            format_cents(entry[4])  # amount
+        )
+        return EntryRow(entry[0], formatted_entry, amount_color)
+
+    @instrument('ui.EntryTable.add_entry')
     def add_entry(self, entries):
-        self.clear_table()
-        for i, entry in enumerate(entries):
-            # Color code based on type
-            amount_text = f"${entry[4]:.2f}"
-            if entry[2] == "Income":
-                amount_color = "income"
+        """Show entries, touching only the Treeview items that changed.
+
+        Existing items are matched to entries by id, so after a one-row
+        add/edit/delete only that row is inserted, updated, moved or deleted
+        and the scroll position and selection are kept.
+        """
+        if self.virtual:
+            self.set_virtual(False)
+            self.clear_table()
+
+        item_for_id = {row.entry_id: item for item, row in self.item_rows.items()}
+        new_order = []
+        for entry in entries:
+            row = self.format_entry(entry)
+            item = item_for_id.pop(entry[0], None)
+            if item is not None and self.item_rows[item] != row:
+                self.table.item(item, values=row.values, tags=(row.tag,))
+                self.item_rows[item] = row
+            new_order.append((item, row))
+
+        # Whatever is left in item_for_id is no longer in the result set
+        removed = set(item_for_id.values())
+        if removed:
+            self.table.delete(*removed)
+            for item in removed:
+                del self.item_rows[item]
+
+        # Keep the longest run of items that are already in the right relative
+        # order and detach the rest, so every out-of-place row costs one move
+        old_index = {item: i for i, item in enumerate(self.item_order)}
+        kept_items = [item for item, row in new_order if item is not None]
+        in_order = longest_increasing_run([old_index[item] for item in kept_items])
+        misplaced = [item for i, item in enumerate(kept_items) if i not in in_order]
+        if misplaced:
+            self.table.detach(*misplaced)
+        misplaced = set(misplaced)
+
+        for index, (item, row) in enumerate(new_order):
+            if item is None:
+                # Insert with tags for coloring
+                item = self.table.insert("", index, values=row.values, tags=(row.tag,))
+                self.item_rows[item] = row
+                new_order[index] = (item, row)
+            elif item in misplaced:
+                self.table.move(item, "", index)
+        self.item_order = [item for item, row in new_order]
+
+    @instrument('ui.EntryTable.append_entries')
+    def append_entries(self, entries):
+        """Add entries below the rows already shown, e.g. older history streamed in (plain mode)."""
+        for entry in entries:
+            row = self.format_entry(entry)
+            item = self.table.insert("", "end", values=row.values, tags=(row.tag,))
+            self.item_rows[item] = row
+            self.item_order.append(item)
+
+    # ----- Virtual mode -------------------------------------------------
+    # For large result sets only one screenful of Treeview items exists.
+    # Rows are fetched in pages from fetch_page (keyset pagination on
+    # (date, id)) and the scrollbar is mapped onto total_rows.
+
+    @instrument('ui.EntryTable.load_virtual')
+    def load_virtual(self, total_rows, fetch_page, keep_position=False, first_rows=None, fetch_jump=None):
+        """Show total_rows entries, materializing only the visible ones.
+
+        fetch_page(limit, older_than=None, newer_than=None, offset=0, from_oldest=False)
+        must return rows newest first, like ExpenseDBHelper.get_entries_page.
+        first_rows, the newest rows if already fetched, seed the page cache.
+        fetch_jump(limit, callback, offset=0, from_oldest=False), if given,
+        reads a page in the background and calls callback(rows) on the Tk
+        thread; deep jumps then show blank rows until it answers instead of
+        running a long OFFSET query on this thread.
+        """
+        selected_id = self.get_selected_entry_id()
+        if not self.virtual:
+            self.clear_table()
+            keep_position = False
+        self.set_virtual(True)
+        self.total_rows = total_rows
+        self.fetch_page = fetch_page
+        self.fetch_jump = fetch_jump
+        self.jump_request += 1
+        self.cache_start = 0
+        self.cache_rows = list(first_rows or [])
+        if not keep_position:
+            self.view_top = 0
+        self.render_virtual(selected_id)
+
+    def set_virtual(self, enabled):
+        """Switch the scrollbar between the Treeview and the virtual row window."""
+        if enabled == self.virtual:
+            return
+        self.virtual = enabled
+        if enabled:
+            self.table.configure(yscrollcommand="")
+            self.scrollbar.configure(command=self._on_virtual_scroll)
+        else:
+            self.table.configure(yscrollcommand=self.scrollbar.set)
+            self.scrollbar.configure(command=self.table.yview)
+            self.row_items = []
+            self.cache_rows = []
+            self.fetch_page = None
+            self.fetch_jump = None
+            self.jump_request += 1
+
+    def visible_row_count(self):
+        # One row's worth of height is taken by the heading
+        return max(1, self.table.winfo_height() // ROW_HEIGHT - 1)
+
+    def ensure_rows(self, start, count):
+        """Make sure rows [start, start + count) are in cache_rows.
+
+        Returns False if they are still being read in the background.
+        """
+        end = min(start + count, self.total_rows)
+        cache_end = self.cache_start + len(self.cache_rows)
+        if self.cache_start <= start and end <= cache_end:
+            return True
+
+        limit = count + 2 * VIRTUAL_OVERSCAN
+        if self.cache_rows and self.cache_start <= start < cache_end <= end:
+            # Scrolled down past the cache: continue after the last cached key
+            last = self.cache_rows[-1]
+            self.cache_rows.extend(self.fetch_page(limit, older_than=(last[1], last[0])))
+        elif self.cache_rows and start < self.cache_start <= end <= cache_end:
+            # Scrolled up past the cache: continue before the first cached key
+            first = self.cache_rows[0]
+            rows = self.fetch_page(limit, newer_than=(first[1], first[0]))
+            self.cache_rows[:0] = rows
+            self.cache_start -= len(rows)
+        else:
+            # Jumped somewhere unrelated (scrollbar drag, Home/End)
+            self.cache_start = max(0, start - VIRTUAL_OVERSCAN)
+            if self.cache_start > self.total_rows // 2:
+                # Past the middle: skip the rows after the page rather than before it
+                page_end = min(self.cache_start + limit, self.total_rows)
+                limit = page_end - self.cache_start
+                page = dict(offset=self.total_rows - page_end, from_oldest=True)
             else:
-                amount_color = "expense"
-            
-            formatted_entry = (
-                entry[1],  # date
-                f"{'💰' if entry[2] == 'Income' else '💸'} {entry[2]}",  # type with emoji
-                f"🏷️ {entry[3]}",  # category with emoji
-                entry[5] or "",  # note
-                amount_text  # amount
-            )
-            
-            # Insert with tags for coloring
-            item = self.table.insert("", "end", values=formatted_entry, tags=(amount_color,))
-            self.entry_ids[item] = entry[0]
-        
-        # Configure tags for row coloring
-        self.table.tag_configure('income', 
-                               background='#E8F5E8', 
-                               foreground=AppStyles.INCOME_COLOR)
-        self.table.tag_configure('expense', 
-                               background='#FFE8E8', 
-                               foreground=AppStyles.SUCCESS_COLOR)
+                page = dict(offset=self.cache_start)
+            if self.fetch_jump is None or page['offset'] < VIRTUAL_DIRECT_OFFSET:
+                self.cache_rows = self.fetch_page(limit, **page)
+            else:
+                self.cache_rows = []
+                self.jump_request += 1
+                request, cache_start = self.jump_request, self.cache_start
+                self.fetch_jump(limit, lambda rows: self.show_jump(request, cache_start, rows), **page)
+                return False
+
+        # Keep the cache bounded to the screen plus overscan on both sides
+        keep_from = max(self.cache_start, start - VIRTUAL_OVERSCAN)
+        keep_to = start + count + VIRTUAL_OVERSCAN
+        del self.cache_rows[keep_to - self.cache_start:]
+        del self.cache_rows[:keep_from - self.cache_start]
+        self.cache_start = keep_from
+        return True
+
+    def show_jump(self, request, cache_start, rows):
+        """Fill in the page a background jump read, unless the view has moved on since."""
+        if request != self.jump_request or not rows:
+            return  # an empty page (failed read) stays blank rather than being asked for again
+        self.cache_start = cache_start
+        self.cache_rows = rows
+        self.render_virtual()
+
+    @instrument('ui.EntryTable.render_virtual')
+    def render_virtual(self, selected_id=None):
+        """Fill the reused Treeview items with the rows at view_top."""
+        if selected_id is None:
+            selected_id = self.get_selected_entry_id()
+        visible = self.visible_row_count()
+        self.view_top = max(0, min(self.view_top, self.total_rows - visible))
+        if self.ensure_rows(self.view_top, visible):
+            offset = self.view_top - self.cache_start
+            rows = self.cache_rows[offset:offset + visible]
+        else:
+            # Blank rows keep the scrollbar in place until the page arrives
+            rows = [None] * min(visible, self.total_rows - self.view_top)
+
+        # Grow or shrink the pool of items to exactly the visible rows
+        while len(self.row_items) < len(rows):
+            self.row_items.append(self.table.insert("", "end"))
+        while len(self.row_items) > len(rows):
+            self.table.delete(self.row_items.pop())
+
+        shown = self.item_rows
+        self.item_rows = {}
+        selected_item = None
+        for item, entry in zip(self.row_items, rows):
+            if entry is None:
+                self.table.item(item, values=(), tags=())
+                continue
+            row = self.format_entry(entry)
+            if shown.get(item) != row:
+                self.table.item(item, values=row.values, tags=(row.tag,))
+            self.item_rows[item] = row
+            if entry[0] == selected_id:
+                selected_item = item
+        if selected_item:
+            self.table.selection_set(selected_item)
+        elif self.table.selection():
+            self.table.selection_remove(*self.table.selection())
+
+        if self.total_rows:
+            self.scrollbar.set(self.view_top / self.total_rows,
+                               (self.view_top + len(rows)) / self.total_rows)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def scroll_virtual(self, rows):
+        new_top = max(0, min(self.view_top + rows, self.total_rows - self.visible_row_count()))
+        if new_top != self.view_top:
+            self.view_top = new_top
+            self.render_virtual()
+
+    def _on_virtual_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.view_top = int(float(amount) * self.total_rows)
+            self.render_virtual()
+        elif action == "scroll":
+            step = self.visible_row_count() if unit == "pages" else 1
+            self.scroll_virtual(int(amount) * step)
+
+    def _on_virtual_wheel(self, event):
+        if not self.virtual:
+            return None
+        if event.num == 4 or event.delta > 0:
+            self.scroll_virtual(-3)
+        else:
+            self.scroll_virtual(3)
+        return "break"
+
+    def _on_virtual_key(self, event):
+        if not self.virtual or not self.row_items:
+            return None
+        visible = self.visible_row_count()
+        selected = self.table.selection()
+        index = self.row_items.index(selected[0]) if selected else -1
+
+        if event.keysym == "Home":
+            self.view_top = 0
+            self.render_virtual()
+        elif event.keysym == "End":
+            self.view_top = self.total_rows
+            self.render_virtual()
+        elif event.keysym == "Prior":
+            self.scroll_virtual(-visible)
+        elif event.keysym == "Next":
+            self.scroll_virtual(visible)
+        elif event.keysym == "Up":
+            if index > 0:
+                self.table.selection_set(self.row_items[index - 1])
+            else:
+                self.scroll_virtual(-1)
+                self.table.selection_set(self.row_items[0])
+        elif event.keysym == "Down":
+            if 0 <= index < len(self.row_items) - 1:
+                self.table.selection_set(self.row_items[index + 1])
+            else:
+                self.scroll_virtual(1)
+                self.table.selection_set(self.row_items[-1])
+        return "break"
+
+    def _on_virtual_resize(self, event):
+        if self.virtual:
+            self.render_virtual()
 
     def get_selected_entry_id(self):
         """Get the ID of the selected entry."""
         selected = self.table.selection()
-        if selected:
-            return self.entry_ids.get(selected[0])
+        if selected and selected[0] in self.item_rows:
+            return self.item_rows[selected[0]].entry_id
         return None
 
     def get_selected_entry_data(self):
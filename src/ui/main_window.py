@@ -2,19 +2,29 @@ import tkinter
 import sys
 import os
 import tkinter.messagebox 
-import csv
+import threading
+from functools import partial
 from tkinter import filedialog, ttk
 from datetime import datetime
-from tkcalendar import DateEntry
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ui_info_top import InfoTop
-from ui_forms import AddForm, EditForm
 from entry_table import EntryTable
-from db_helper import db
+from db_helper import ExpenseDBHelper, db, entry_matcher, filters_within, fts_query
+from query_worker import QueryWorker
+from instrumentation import instrument
 from styles import AppStyles  # Import the styles
 
+# Result sets larger than this are shown in EntryTable's virtual (paged) mode
+VIRTUAL_THRESHOLD = 5000
+# Quiet period after typing or picking a filter before it is queried (ms)
+FILTER_DELAY = 200
+# At startup the newest FIRST_PAGE_ROWS entries are shown first; older ones
+# follow in chunks of STREAM_CHUNK rows, one per idle callback
+FIRST_PAGE_ROWS = 50
+STREAM_CHUNK = 500
+
 class MainWindow(tkinter.Tk):
 
     def __init__(self):
@@ -46,6 +56,8 @@ class MainWindow(tkinter.Tk):
         
         self.filters_frame = tkinter.Frame(self.filters_container, bg=AppStyles.BG_SECONDARY)
         self.filters_frame.pack(fill="x", padx=15, pady=12)
+        # The date pickers start at today; they only filter once a date was picked or Apply was clicked
+        self.dates_active = False
         self.create_filters_frame()
 
         # Table container with border
@@ -57,6 +69,9 @@ class MainWindow(tkinter.Tk):
         self.entry_table.pack(expand=True, fill="both", padx=10, pady=10)
 
         self.entry_table.bind_double_click(self.on_row_double_click)
+
+        # Created on first use; matplotlib is slow to import
+        self.charts = None
         
         # Buttons Frame at Bottom with better styling
         self.buttons_container = tkinter.Frame(self.main_container, bg=AppStyles.BG_PRIMARY)
@@ -66,8 +81,23 @@ class MainWindow(tkinter.Tk):
         self.buttons_frame.pack(anchor="center")
         self.create_action_buttons()
 
-        # Load data after UI is created
-        self.after(100, self.refresh_data)
+        # Reads run on a worker thread with its own connection; writes stay
+        # on the shared connection
+        self.queries = QueryWorker(self, db.db_path)
+        self.active_filters = None  # filters behind the current table view
+        self.shown = None           # (filters, totals, entries) on screen, for narrowing in memory
+        self.wanted_filters = None  # filters last asked for, shown or still loading
+        self.filter_after = None
+        self.stream_after = None    # next chunk of older entries at startup
+
+        # Release the database connections when the window closes
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # The category filter follows the database's category list
+        db.add_category_listener(self.show_categories)
+
+        # Load data once the window is on screen
+        self.after(100, self.finish_startup)
 
     def configure_ttk_styles(self):
         """Configure ttk widget styles"""
@@ -110,6 +140,12 @@ class MainWindow(tkinter.Tk):
                                           **AppStyles.BUTTON_DANGER)
         self.delete_button.pack(side="left", padx=8)
 
+        self.charts_button = tkinter.Button(self.buttons_frame, 
+                                          text="📈 Charts", 
+                                          command=self.toggle_charts,
+                                          **AppStyles.BUTTON_SECONDARY)
+        self.charts_button.pack(side="left", padx=8)
+
     def create_filters_frame(self):
         # Title for filters section
         filter_title = tkinter.Label(self.filters_frame, 
@@ -135,14 +171,9 @@ class MainWindow(tkinter.Tk):
                                  fg=AppStyles.TEXT_PRIMARY)
         date_label.pack(side="left", padx=(0, 5))
         
-        self.from_date_entry = DateEntry(filters_left, 
-                                        width=12, 
-                                        background=AppStyles.PRIMARY_COLOR,
-                                        foreground='white', 
-                                        borderwidth=1,
-                                        font=AppStyles.FONT_BODY,
-                                        date_pattern='mm-dd-yyyy')
-        self.from_date_entry.pack(side="left", padx=(0, 15))
+        # Look-alike stand-ins until create_date_filters swaps in the real pickers
+        self.from_date_entry = self.to_date_entry = None
+        self.from_date_slot = self.create_date_slot(filters_left)
 
         to_label = tkinter.Label(filters_left, 
                                text="📅 To:", 
@@ -151,14 +182,7 @@ class MainWindow(tkinter.Tk):
                                fg=AppStyles.TEXT_PRIMARY)
         to_label.pack(side="left", padx=(0, 5))
         
-        self.to_date_entry = DateEntry(filters_left, 
-                                      width=12, 
-                                      background=AppStyles.PRIMARY_COLOR,
-                                      foreground='white', 
-                                      borderwidth=1,
-                                      font=AppStyles.FONT_BODY,
-                                      date_pattern='mm-dd-yyyy')
-        self.to_date_entry.pack(side="left", padx=(0, 15))
+        self.to_date_slot = self.create_date_slot(filters_left)
 
         # Category Filter
         cat_label = tkinter.Label(filters_left, 
@@ -176,6 +200,7 @@ class MainWindow(tkinter.Tk):
                                            font=AppStyles.FONT_BODY,
                                            width=12)
         self.category_filter.set("All")
+        self.category_filter.bind("<<ComboboxSelected>>", self.on_filter_change)
         self.category_filter.pack(side="left", padx=(0, 15))
 
         # Type Filter 
@@ -194,8 +219,24 @@ class MainWindow(tkinter.Tk):
                                        font=AppStyles.FONT_BODY,
                                        width=8)
         self.type_filter.set("All")
+        self.type_filter.bind("<<ComboboxSelected>>", self.on_filter_change)
         self.type_filter.pack(side="left", padx=(0, 15))
 
+        # Full-text search over notes and category names
+        search_label = tkinter.Label(filters_left, 
+                                   text="🔎 Search:", 
+                                   font=AppStyles.FONT_BODY,
+                                   bg=AppStyles.BG_SECONDARY,
+                                   fg=AppStyles.TEXT_PRIMARY)
+        search_label.pack(side="left", padx=(0, 5))
+
+        self.search_text = tkinter.StringVar(self)
+        self.search_entry = tkinter.Entry(filters_left, width=16, textvariable=self.search_text,
+                                          **AppStyles.ENTRY_STYLE)
+        self.search_text.trace_add("write", self.on_filter_change)
+        self.search_entry.bind("<Return>", self.flush_filter_change)
+        self.search_entry.pack(side="left", padx=(0, 15))
+
         # Filter Action Buttons
         button_frame = tkinter.Frame(filters_left, bg=AppStyles.BG_SECONDARY)
         button_frame.pack(side="left")
@@ -217,13 +258,6 @@ class MainWindow(tkinter.Tk):
                                                 command=self.clear_filters,
                                                 **clear_btn_style)
         self.clear_filter_button.pack(side="left", padx=3)
-        
-        self.refresh_categories_button = tkinter.Button(button_frame, 
-                                                      text="↻", 
-                                                      command=self.refresh_categories, 
-                                                      width=3,
-                                                      **clear_btn_style)
-        self.refresh_categories_button.pack(side="left", padx=3)
 
         # Right side - Export
         filters_right = tkinter.Frame(filters_row, bg=AppStyles.BG_SECONDARY)
@@ -238,12 +272,50 @@ class MainWindow(tkinter.Tk):
                                           **export_btn_style)
         self.export_button.pack(side="right")
 
-    def get_categories_safe(self):
-        """Safely get categories with fallback."""
+        self.import_button = tkinter.Button(filters_right, 
+                                          text="📥 Import CSV", 
+                                          command=self.import_from_csv,
+                                          **export_btn_style)
+        self.import_button.pack(side="right", padx=(0, 6))
+
+    def create_date_slot(self, parent):
+        slot = ttk.Combobox(parent, width=12, font=AppStyles.FONT_BODY, state="readonly")
+        slot.set(datetime.now().strftime('%m-%d-%Y'))
+        slot.pack(side="left", padx=(0, 15))
+        return slot
+
+    def create_date_filters(self):
+        """Replace the date stand-ins with tkcalendar pickers.
+
+        Done once the window is on screen, since tkcalendar (and babel
+        behind it) takes longer to import than the rest of the UI.
+        """
+        if self.from_date_entry is not None:
+            return
+        from tkcalendar import DateEntry
+
+        pickers = []
+        for slot in (self.from_date_slot, self.to_date_slot):
+            picker = DateEntry(slot.master, 
+                               width=12, 
+                               background=AppStyles.PRIMARY_COLOR,
+                               foreground='white', 
+                               borderwidth=1,
+                               font=AppStyles.FONT_BODY,
+                               date_pattern='mm-dd-yyyy')
+            picker.bind("<<DateEntrySelected>>", self.on_date_change)
+            picker.bind("<Return>", self.on_date_change)
+            picker.pack(side="left", padx=(0, 15), before=slot)
+            slot.destroy()
+            pickers.append(picker)
+        self.from_date_entry, self.to_date_entry = pickers
+        self.from_date_slot = self.to_date_slot = None
+
+    def get_categories_safe(self, db_categories=None):
+        """Merge database categories into the defaults, with fallback."""
         default_categories = ["All", "Food", "Transport", "Utilities", "Entertainment", "Other"]
         
         try:
-            db_categories = db.get_all_categories()
             if db_categories:
                 # Combine and deduplicate
                 all_cats = set(default_categories[1:] + db_categories)
@@ -255,11 +327,19 @@ class MainWindow(tkinter.Tk):
             return default_categories
 
     def refresh_categories(self):
-        """Refresh the category filter dropdown with current database categories."""
+        """Fill the category filter from the database's in-memory category list.
+
+        Only needed once at startup: afterwards show_categories is called
+        by the database whenever the set of categories changes.
+        """
+        self.show_categories(db.get_all_categories())
+
+    @instrument('ui.show_categories')
+    def show_categories(self, db_categories):
         current_selection = self.category_filter.get()
         
         # Get updated categories
-        categories = self.get_categories_safe()
+        categories = self.get_categories_safe(db_categories)
         
         # Update the combobox values
         self.category_filter['values'] = categories
@@ -270,85 +350,255 @@ class MainWindow(tkinter.Tk):
         else:
             self.category_filter.set("All")
 
+    def read_filters(self):
+        """The filter widgets as get_filtered_entries arguments, or None when nothing is filtered."""
+        filters = dict(category=self.category_filter.get(), entry_type=self.type_filter.get(),
+                       search=self.search_entry.get().strip() or None)
+        if self.dates_active:
+            filters.update(from_date=self.from_date_entry.get_date().isoformat(),
+                           to_date=self.to_date_entry.get_date().isoformat())
+        elif filters == dict(category="All", entry_type="All", search=None):
+            return None
+        return filters
+
+    def on_date_change(self, event=None):
+        self.dates_active = True
+        self.on_filter_change()
+
+    def cancel_filter_change(self):
+        if self.filter_after is not None:
+            self.after_cancel(self.filter_after)
+            self.filter_after = None
+
+    def flush_filter_change(self, event=None):
+        """Run the query on_filter_change has scheduled now rather than after the pause."""
+        if self.filter_after is None:
+            return
+        self.cancel_filter_change()
+        if self.wanted_filters is None:
+            self.refresh_data()
+        else:
+            self.load_filtered(self.wanted_filters)
+
+    def on_filter_change(self, *args):
+        """Filter as the user types or picks: show what can be narrowed at once, query the rest after a pause."""
+        self.cancel_filter_change()
+        filters = self.read_filters()
+        if filters == self.wanted_filters:
+            return
+        self.stop_streaming()
+        self.wanted_filters = filters
+        # Whatever is still loading is for filters the user has moved on from
+        self.queries.cancel("table")
+
+        if self.show_narrowed(filters):
+            return  # exact: nothing left to query
+        if filters is None:
+            self.filter_after = self.after(FILTER_DELAY, self.refresh_data)
+        else:
+            self.filter_after = self.after(FILTER_DELAY, self.load_filtered, filters)
+
+    @instrument('ui.show_narrowed')
+    def show_narrowed(self, filters):
+        """Show the rows on screen that pass filters, when they are known to include every match.
+
+        That is the case when the loaded result is complete (not paged or
+        cut off) and filters are at least as tight as the ones it was loaded
+        for. Returns True when the narrowed rows are the final result; a
+        changed search is still queried afterwards for its ranking.
+        """
+        if self.shown is None or filters is None:
+            return False
+        shown_filters, totals, entries = self.shown
+        if entries is None or len(entries) != totals[3] or not filters_within(filters, shown_filters):
+            return False
+        same_search = fts_query(filters.get("search")) == fts_query(shown_filters.get("search"))
+        if not same_search and not db.full_text_search:
+            return False  # LIKE matching is not mirrored in memory
+
+        # Rows already matched the search when it is unchanged
+        matches = entry_matcher(**dict(filters, search=None if same_search else filters.get("search")))
+        entries = [entry for entry in entries if matches(entry)]
+        income = sum(entry[4] for entry in entries if entry[2] == "Income")
+        expense = sum(entry[4] for entry in entries if entry[2] != "Income")
+        totals = (income, expense, income - expense, len(entries))
+        self.show_entries((totals, entries), partial(db.get_entries_page, **filters), filters)
+        return same_search
+
     def apply_filters(self):
         """Apply filters to the table display."""
-        from_date = self.from_date_entry.get()
-        to_date = self.to_date_entry.get()
-        category = self.category_filter.get()
-        entry_type = self.type_filter.get()
-
-        print(f"Debug - Applying filters: category={category}, type={entry_type}")
-
-        # Get filtered entries from database
-        entries = db.get_filtered_entries(from_date, to_date, category, entry_type)
-        self.entry_table.add_entry(entries)
-
-        # Update balance based on filtered data
-        total_income, total_expense, balance = db.get_filtered_totals(from_date, to_date, category, entry_type)
-        self.info_top.update_balance(balance)
-        self.info_top.set_filter_status(True)
-
-        # Visual feedback is automatic with Combobox - no need to update manually!
-
-
+        self.cancel_filter_change()
+        self.create_date_filters()
+        self.dates_active = True
+        filters = self.read_filters()
+        self.wanted_filters = filters
+        self.load_filtered(filters)
+
+    def load_filtered(self, filters):
+        """Query the entries and totals for filters on the worker thread and show them."""
+        self.cancel_filter_change()
+        self.stop_streaming()
+        search = filters.get("search")
+
+        def load(worker_db):
+            with worker_db.snapshot():
+                # Totals first: the row count decides how the table is filled
+                totals = worker_db.get_filtered_totals(**filters)
+                entries = None
+                if search:
+                    # Search results are listed best match first, up to the table's limit
+                    entries = worker_db.get_filtered_entries(**filters, limit=VIRTUAL_THRESHOLD)
+                elif totals[3] <= VIRTUAL_THRESHOLD:
+                    entries = worker_db.get_filtered_entries(**filters)
+            return totals, entries
+
+        fetch_page = partial(db.get_entries_page, **filters)
+        # Shares the "table" key with refresh_data, so a newer click supersedes it
+        self.queries.submit("table", load, lambda result: self.show_entries(result, fetch_page, filters))
 
     def clear_filters(self):
         """Clear all filters and show all data."""
-        today = datetime.now().date()
-        self.from_date_entry.set_date(today)
-        self.to_date_entry.set_date(today)
+        if self.from_date_entry is not None:
+            today = datetime.now().date()
+            self.from_date_entry.set_date(today)
+            self.to_date_entry.set_date(today)
         
         # Clear dropdowns - visual feedback is automatic with Combobox
         self.category_filter.set("All")
         self.type_filter.set("All")
+        self.dates_active = False
+        self.search_entry.delete(0, "end")
         
         self.info_top.set_filter_status(False)
         self.refresh_data()
 
     def export_to_csv(self):
-        """Export current table data to CSV file."""
-        try:
-            entries = db.get_all_entries()
-            
-            if not entries:
-                tkinter.messagebox.showinfo("No Data", "No entries to export.")
+        """Export entries to a CSV file, streaming them on a background thread."""
+        from csv_io import export_entries
+
+        filters = {}
+        if self.active_filters:
+            choice = tkinter.messagebox.askyesnocancel(
+                "Export CSV", "Export only the entries matching the current filters?\n\n"
+                              "Choose No to export all entries.")
+            if choice is None:
                 return
+            if choice:
+                filters = self.active_filters
+
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            title="Save CSV file"
+        )
+        if not filename:
+            return
+
+        def work(task_db, progress):
+            # Counting a search's matches takes a while too, so it is done here rather than on the Tk thread
+            count = task_db.get_filtered_totals(**filters)[3]
+            if not count:
+                return 0
+
+            def report(rows):
+                progress['text'] = f"📊 Exporting {min(100, rows * 100 // count)}%"
+            return export_entries(task_db, filename, progress=report, **filters)
+
+        def done(rows, error):
+            if error is not None:
+                tkinter.messagebox.showerror("Export Error", f"Failed to export data: {str(error)}")
+            elif not rows:
+                tkinter.messagebox.showinfo("No Data", "No entries to export.")
+            else:
+                tkinter.messagebox.showinfo("Export Successful", f"Data exported to {filename}")
 
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".csv",
-                filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
-                title="Save CSV file"
-            )
+        self.run_file_task(self.export_button, work, done)
 
-            if filename:
-                with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                    writer = csv.writer(csvfile)
-                    writer.writerow(['ID', 'Date', 'Type', 'Category', 'Amount', 'Note', 'Created At'])
-                    for entry in entries:
-                        writer.writerow(entry)
+    def import_from_csv(self):
+        """Bulk-import entries from a CSV file on a background thread."""
+        from csv_io import import_entries
 
-                tkinter.messagebox.showinfo("Export Successful", f"Data exported to {filename}")
+        filename = filedialog.askopenfilename(
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            title="Import CSV file"
+        )
+        if not filename:
+            return
 
-        except Exception as e:
-            tkinter.messagebox.showerror("Export Error", f"Failed to export data: {str(e)}")
+        def work(task_db, progress):
+            def report(lines):
+                progress['text'] = f"📥 Importing… {lines:,} rows"
+            return import_entries(task_db, filename, progress=report)
+
+        def done(result, error):
+            if error is not None:
+                tkinter.messagebox.showerror("Import Error", f"Failed to import data: {str(error)}")
+                return
+            message = f"Imported {result.imported:,} entries."
+            if result.resumed_from:
+                message += f"\nResumed an interrupted import after line {result.resumed_from:,}."
+            if result.duplicates:
+                message += f"\nSkipped {result.duplicates:,} entries that were already imported."
+            if result.invalid:
+                message += f"\nSkipped {result.invalid:,} invalid rows, e.g.:"
+                for line, error_text in result.errors[:5]:
+                    message += f"\n  line {line}: {error_text}"
+            tkinter.messagebox.showinfo("Import Finished", message)
+            self.refresh_data()
+            # The import wrote through its own connection
+            db.sync_categories()
+
+        self.run_file_task(self.import_button, work, done)
+
+    def run_file_task(self, button, work, on_done):
+        """Run work(task_db, progress) on a thread with its own database connection.
+
+        work may set progress['text'] to show progress on the (disabled)
+        button; on_done(result, error) is called on the Tk thread afterwards.
+        """
+        # Written by the task thread, read by poll_file_task on the Tk thread
+        progress = {'text': button.cget("text"), 'done': False, 'result': None, 'error': None}
+        idle_text = progress['text']
+
+        def run():
+            try:
+                with ExpenseDBHelper(db.db_path) as task_db:
+                    progress['result'] = work(task_db, progress)
+            except Exception as e:
+                progress['error'] = e
+            finally:
+                progress['done'] = True
+
+        threading.Thread(target=run, daemon=True).start()
+        button.config(state="disabled")
+        self.poll_file_task(button, idle_text, progress, on_done)
+
+    def poll_file_task(self, button, idle_text, progress, on_done):
+        if not progress['done']:
+            button.config(text=progress['text'])
+            self.after(100, self.poll_file_task, button, idle_text, progress, on_done)
+            return
+        button.config(text=idle_text, state="normal")
+        on_done(progress['result'], progress['error'])
 
     def open_add_form(self):
-        dialog = AddForm(self, root_window=self)
+        # The forms (and tkcalendar) are imported on first use
+        from ui_forms import AddForm
+        dialog = AddForm(self, root_window=self, db=db)
         self.wait_window(dialog)
         if dialog.result:
             db.add_entry(dialog.result)
             self.refresh_data()
-            self.refresh_categories()
 
     def open_edit_form(self):
         entry_data = self.entry_table.get_selected_entry_data()
         if entry_data:
-            dialog = EditForm(self, entry_data=entry_data)
+            from ui_forms import EditForm
+            dialog = EditForm(self, entry_data=entry_data, db=db)
             self.wait_window(dialog)
             if dialog.result:
                 db.update_entry(entry_data[0], dialog.result)
                 self.refresh_data()
-                self.refresh_categories()
         else:
             tkinter.messagebox.showwarning("No Selection", "Please select an entry to edit.")
 
@@ -359,15 +609,132 @@ class MainWindow(tkinter.Tk):
             if result:
                 db.delete_entry(entry_data[0])
                 self.refresh_data()
-                self.refresh_categories()
         else:
             tkinter.messagebox.showwarning("No Selection", "Please select an entry to delete.")
 
+    def toggle_charts(self):
+        """Switch the center area between the entry table and the charts dashboard."""
+        if self.charts is None:
+            from charts import ChartsPanel
+            self.charts = ChartsPanel(self.table_container, self.queries)
+
+        if self.charts.shown:
+            self.charts.hide()
+            self.charts.pack_forget()
+            self.entry_table.pack(expand=True, fill="both", padx=10, pady=10)
+            self.charts_button.config(text="📈 Charts")
+        else:
+            self.entry_table.pack_forget()
+            self.charts.pack(expand=True, fill="both", padx=10, pady=10)
+            self.charts.show(self.active_filters)
+            self.charts_button.config(text="📋 Table")
+
     def on_row_double_click(self, event):
         self.open_edit_form()
     
+    def finish_startup(self):
+        """Work left for after the first paint."""
+        # The worker opens the database first, running any migrations, and
+        # only then does this thread open its own connection for the
+        # categories; opening both at once makes them race to migrate.
+        def opened(result):
+            self.refresh_categories()
+        self.queries.submit("open", lambda worker_db: worker_db.full_text_search, opened, opened)
+        # The worker reads the newest entries while this thread builds the date pickers
+        self.load_first_page()
+        self.create_date_filters()
+
+    def load_first_page(self):
+        """Show the newest screenful and the balance first, then stream in the older entries."""
+        self.cancel_filter_change()
+        self.stop_streaming()
+        self.wanted_filters = None
+        self.shown = None
+
+        def load(worker_db):
+            with worker_db.snapshot():
+                # entry_totals is one row, so the totals cost the same for any amount of history
+                totals = worker_db.get_totals()
+                page = worker_db.get_entries_page(FIRST_PAGE_ROWS)
+            return totals, page
+
+        self.queries.submit("table", load, self.show_first_page)
+
+    def show_first_page(self, result):
+        totals, page = result
+        if totals[3] > VIRTUAL_THRESHOLD:
+            # Paged anyway; the page just read seeds the table's page cache
+            self.show_entries((totals, None), db.get_entries_page, first_rows=page)
+            return
+        self.show_entries((totals, page), db.get_entries_page)
+        if len(page) < totals[3]:
+            self.stream_after = self.after_idle(self.stream_older, totals, page)
+
+    def stream_older(self, totals, entries):
+        """Fetch the next chunk of entries older than the last one shown."""
+        self.stream_after = None
+        last = entries[-1]
+
+        def load(worker_db):
+            return worker_db.get_entries_page(STREAM_CHUNK, older_than=(last[1], last[0]))
+
+        # A refresh or filter change supersedes the "table" request and so ends the stream
+        self.queries.submit("table", load, lambda rows: self.show_streamed(totals, entries, rows))
+
+    @instrument('ui.show_streamed')
+    def show_streamed(self, totals, entries, rows):
+        self.entry_table.append_entries(rows)
+        entries.extend(rows)
+        # Complete (and so narrowable by filters) once every entry has arrived
+        self.shown = ({}, totals, entries)
+        if len(rows) == STREAM_CHUNK and len(entries) < totals[3]:
+            self.stream_after = self.after_idle(self.stream_older, totals, entries)
+
+    def stop_streaming(self):
+        if self.stream_after is not None:
+            self.after_cancel(self.stream_after)
+            self.stream_after = None
+
     def refresh_data(self):
-        entries = db.get_all_entries()
-        self.entry_table.add_entry(entries)
-        total_income, total_expense, balance = db.get_totals()
-        self.info_top.update_balance(balance)
\ No newline at end of file
+        self.cancel_filter_change()
+        self.stop_streaming()
+        self.wanted_filters = None
+        # After a write the rows on screen are stale; do not narrow them
+        self.shown = None
+
+        def load(worker_db):
+            # Both reads share one transaction on the worker's connection
+            with worker_db.snapshot():
+                totals = worker_db.get_totals()
+                entries = worker_db.get_all_entries() if totals[3] <= VIRTUAL_THRESHOLD else None
+            return totals, entries
+
+        self.queries.submit("table", load, lambda result: self.show_entries(result, db.get_entries_page))
+
+    @instrument('ui.show_entries')
+    def show_entries(self, result, fetch_page, filters=None, first_rows=None):
+        """Display a (totals, entries) result from the worker thread."""
+        (total_income, total_expense, balance, count), entries = result
+        self.active_filters = filters
+        self.shown = (filters or {}, result[0], entries)
+        if entries is None:
+            # Too many rows to materialize: page them in as the user scrolls
+            self.entry_table.load_virtual(count, fetch_page, keep_position=filters is None, first_rows=first_rows,
+                                          fetch_jump=partial(self.fetch_jump, filters or {}))
+        else:
+            self.entry_table.add_entry(entries)
+        self.info_top.update_balance(balance)
+        self.info_top.set_filter_status(filters is not None, count if entries is None else len(entries), count)
+        if self.charts is not None:
+            # Charts follow the table's filters and data changes
+            self.charts.schedule_refresh(filters)
+
+    def fetch_jump(self, filters, limit, callback, **page):
+        """Read a page of the virtual table on the worker; a newer jump supersedes it."""
+        self.queries.submit("page", lambda worker_db: worker_db.get_entries_page(limit, **page, **filters), callback)
+
+    def on_close(self):
+        db.remove_category_listener(self.show_categories)
+        self.queries.shutdown()
+        db.close()
+        self.destroy()
\ No newline at end of file
@@ -0,0 +1,136 @@
+# Background query worker so the Tk mainloop never blocks on SQLite
+import queue
+import threading
+import time
+
+from db_helper import ExpenseDBHelper, is_interrupted
+from instrumentation import ENABLED as METRICS_ENABLED, metrics
+
+
+class QueryWorker:
+    """Run database reads on a worker thread with its own connection.
+
+    Results are handed back to the Tk thread by polling a queue with
+    after(), since Tk widgets must only be touched from the mainloop.
+    Every request has a key; a newer request with the same key supersedes
+    the older one (e.g. each keystroke in the search box).
+    """
+
+    POLL_INTERVAL = 15  # ms
+
+    def __init__(self, widget, db_path):
+        self.widget = widget
+        self.db_path = db_path
+        self.executor = None        # started by the first submit
+        self.results = queue.Queue()
+        self.db = None              # created on the worker thread
+        self.latest = {}            # key -> (ticket, future) of the newest request
+        self.ticket = 0
+        self.running_ticket = None
+        self.running_lock = threading.Lock()
+        self.pending = 0
+        self.polling = False
+
+    def submit(self, key, query, callback, error_callback=None):
+        """Run query(worker_db) in the background and call callback(result) on the Tk thread.
+
+        If an older request with the same key has not started yet it is
+        cancelled; if it is running, its SQLite statement is interrupted.
+        Either way its result is dropped.
+        """
+        self.ticket += 1
+        ticket = self.ticket
+
+        previous = self.latest.get(key)
+        if previous is not None:
+            previous_ticket, previous_future = previous
+            if previous_future.cancel():
+                self.pending -= 1
+            else:
+                self.interrupt(previous_ticket)
+
+        if self.executor is None:
+            # concurrent.futures pulls in logging; not worth it before the window is up
+            from concurrent.futures import ThreadPoolExecutor
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-query")
+        future = self.executor.submit(self._run, ticket, key, query, callback, error_callback)
+        self.latest[key] = (ticket, future)
+        self.pending += 1
+        if not self.polling:
+            self.polling = True
+            self.widget.after(self.POLL_INTERVAL, self._poll)
+        return ticket
+
+    def cancel(self, key):
+        """Drop the outstanding request for key, if any."""
+        previous = self.latest.pop(key, None)
+        if previous is not None:
+            previous_ticket, previous_future = previous
+            if previous_future.cancel():
+                self.pending -= 1
+            else:
+                self.interrupt(previous_ticket)
+
+    def interrupt(self, ticket):
+        """Abort the running SQLite statement if it belongs to ticket."""
+        with self.running_lock:
+            if self.running_ticket == ticket and self.db is not None:
+                self.db.interrupt()
+
+    def shutdown(self):
+        for key in list(self.latest):
+            self.cancel(key)
+        if self.executor is None:
+            return
+        # Pending queries are cancelled above; the close must still run
+        self.executor.submit(self._close_db)
+        self.executor.shutdown(wait=False)
+
+    def _run(self, ticket, key, query, callback, error_callback):
+        # Runs on the worker thread
+        if self.db is None:
+            self.db = ExpenseDBHelper(self.db_path)
+        with self.running_lock:
+            self.running_ticket = ticket
+        start = time.perf_counter()
+        try:
+            result, error = query(self.db), None
+        except Exception as e:
+            result, error = None, e
+        finally:
+            with self.running_lock:
+                self.running_ticket = None
+        if METRICS_ENABLED:
+            metrics.record(f"worker.{key}", (time.perf_counter() - start) * 1000)
+        self.results.put((ticket, key, callback, error_callback, result, error))
+
+    def _close_db(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def _poll(self):
+        # Runs on the Tk thread
+        while True:
+            try:
+                ticket, key, callback, error_callback, result, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            latest = self.latest.get(key)
+            if latest is None or latest[0] != ticket:
+                continue  # superseded
+            del self.latest[key]
+            if error is None:
+                callback(result)
+            elif is_interrupted(error):
+                continue  # cancelled, not failed
+            elif error_callback is not None:
+                error_callback(error)
+            else:
+                print(f"Error running background query '{key}': {error}")
+
+        if self.pending > 0:
+            self.widget.after(self.POLL_INTERVAL, self._poll)
+        else:
+            self.polling = False
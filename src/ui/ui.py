@@ -1,16 +1,10 @@
-import tkinter
 from main_window import MainWindow
 
 def create_main_window():
-    # Ensure tkinter is working
-    root = tkinter.Tk()
-    root.withdraw()  # Hide the default root window
-    
-    # Create the main application window
+    # MainWindow is the Tk root itself; it loads its data once it is on screen
     app = MainWindow()
     
     # Ensure it's visible
-    app.deiconify()
     app.lift()
     app.focus_force()
     
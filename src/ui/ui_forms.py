@@ -3,15 +3,34 @@ import tkinter.messagebox
 from datetime import datetime
 from tkcalendar import DateEntry 
 from styles import AppStyles
+from validation import validate_entry
+from money import cents_to_str
+from db_helper import BUILTIN_CATEGORIES
 
 # UI component for displaying forms for adding/editing expenses and income (entry form and edit form)
 # Fields: Amount input, Category dropdown, Date picker, Note input
 
+
+def category_choices(names=()):
+    """Category dropdown choices: built-in categories, then custom ones in use, then "Other"."""
+    custom = sorted((name for name in names if name not in BUILTIN_CATEGORIES and name != "Other"), key=str.casefold)
+    return list(BUILTIN_CATEGORIES) + custom + ["Other"]
+
+
+def set_dropdown_choices(dropdown, variable, choices):
+    """Replace the items of a tk.OptionMenu, keeping the current selection."""
+    menu = dropdown['menu']
+    menu.delete(0, 'end')
+    for choice in choices:
+        menu.add_command(label=choice, command=tk._setit(variable, choice))
+
+
 class AddForm(tk.Toplevel):
-    def __init__(self, master=None, root_window=None):
+    def __init__(self, master=None, root_window=None, db=None):
         super().__init__(master)
         self.master = master
         self.root_window = root_window
+        self.db = db  # source of the custom categories, if any
 
         self.title("💰 Add New Entry")
         self.geometry("450x400")  # Fixed size instead of 350x1000
@@ -22,6 +41,7 @@ class AddForm(tk.Toplevel):
         self.center_window()
         self.result = None
         self.create_widgets()
+        self.follow_categories()
     
     def create_widgets(self):
         # Main container with padding
@@ -100,8 +120,8 @@ class AddForm(tk.Toplevel):
         category_frame = tk.Frame(form_content, bg=AppStyles.BG_SECONDARY)
         category_frame.grid(row=5, column=0, columnspan=2, sticky="ew", pady=(0, 15))
         
-        self.category_dropdown = tk.OptionMenu(category_frame, self.category_var, 
-                                             "Food", "Transport", "Utilities", "Entertainment", "Other")
+        self.choices = category_choices()
+        self.category_dropdown = tk.OptionMenu(category_frame, self.category_var, *self.choices)
         self.category_dropdown.config(font=AppStyles.FONT_BODY,
                                     bg=AppStyles.BG_SECONDARY,
                                     fg=AppStyles.TEXT_PRIMARY,
@@ -163,6 +183,21 @@ class AddForm(tk.Toplevel):
                                      **cancel_style)
         self.cancel_button.pack(side="left", padx=10)
 
+    def follow_categories(self):
+        """List the database's categories in the dropdown and keep it in step while open."""
+        if self.db is not None:
+            self.set_categories(self.db.get_all_categories())
+            self.db.add_category_listener(self.set_categories)
+
+    def set_categories(self, names):
+        self.choices = category_choices(names)
+        set_dropdown_choices(self.category_dropdown, self.category_var, self.choices)
+
+    def destroy(self):
+        if self.db is not None:
+            self.db.remove_category_listener(self.set_categories)
+        super().destroy()
+
     def check_if_other_category(self, value):
         if value == "Other":
             self.other_entry_label.grid(row=1, column=2, padx=5, pady=5)
@@ -173,15 +208,6 @@ class AddForm(tk.Toplevel):
 
     def submit_form(self):
         # Handle form submission
-        try:
-            amount = float(self.amount_entry.get())
-            if amount <= 0:
-                tk.messagebox.showerror("Error", "Amount must be greater than 0.")
-                return
-        except ValueError:
-            tk.messagebox.showerror("Error", "Please enter a valid amount.")
-            return
-            
         type_val = self.type_var.get()
         category = self.category_var.get()
         if category == "Other":
@@ -190,20 +216,16 @@ class AddForm(tk.Toplevel):
                 tk.messagebox.showerror("Error", "Please specify the 'Other' category.")
                 return
 
-        date = self.date_entry.get()
+        # Stored as ISO-8601 (YYYY-MM-DD); the widget shows mm-dd-yyyy
+        date = self.date_entry.get_date().isoformat()
         note = self.note_entry.get()
-        
-        if not category or not type_val:
-            tk.messagebox.showerror("Error", "Please fill in all required fields.")
+
+        # Same rules as the CSV importer
+        try:
+            self.result = validate_entry(type_val, self.amount_entry.get(), category, date, note)
+        except ValueError as e:
+            tk.messagebox.showerror("Error", str(e))
             return
-        
-        self.result = {
-            "type": type_val,
-            "amount": amount,
-            "category": category,
-            "date": date,
-            "note": note
-        }
         self.destroy()
 
     def cancel_form(self):
@@ -221,10 +243,11 @@ class AddForm(tk.Toplevel):
 
 # Edit Form Class with enhanced styling
 class EditForm(tk.Toplevel):
-    def __init__(self, master=None, entry_data=None):
+    def __init__(self, master=None, entry_data=None, db=None):
         super().__init__(master)
         self.master = master
         self.entry_data = entry_data
+        self.db = db  # source of the custom categories, if any
         self.entry_id = entry_data[0] if entry_data else None
         
         self.title("✏️ Edit Entry")
@@ -236,6 +259,7 @@ class EditForm(tk.Toplevel):
         self.center_window()
         self.result = None
         self.create_widgets()
+        self.follow_categories()
         self.populate_fields()
     
     def create_widgets(self):
@@ -316,8 +340,8 @@ class EditForm(tk.Toplevel):
         category_frame = tk.Frame(form_content, bg=AppStyles.BG_SECONDARY)
         category_frame.grid(row=5, column=0, columnspan=2, sticky="ew", pady=(0, 15))
         
-        self.category_dropdown = tk.OptionMenu(category_frame, self.category_var, 
-                                             "Food", "Transport", "Utilities", "Entertainment", "Other")
+        self.choices = category_choices()
+        self.category_dropdown = tk.OptionMenu(category_frame, self.category_var, *self.choices)
         self.category_dropdown.config(font=AppStyles.FONT_BODY,
                                     bg=AppStyles.BG_SECONDARY,
                                     fg=AppStyles.TEXT_PRIMARY,
@@ -379,6 +403,21 @@ class EditForm(tk.Toplevel):
                                      **cancel_style)
         self.cancel_button.pack(side="left", padx=10)
 
+    def follow_categories(self):
+        """List the database's categories in the dropdown and keep it in step while open."""
+        if self.db is not None:
+            self.set_categories(self.db.get_all_categories())
+            self.db.add_category_listener(self.set_categories)
+
+    def set_categories(self, names):
+        self.choices = category_choices(names)
+        set_dropdown_choices(self.category_dropdown, self.category_var, self.choices)
+
+    def destroy(self):
+        if self.db is not None:
+            self.db.remove_category_listener(self.set_categories)
+        super().destroy()
+
     def check_if_other_category(self, value):
         if value == "Other":
             self.other_entry_label.grid(row=10, column=0, sticky="w", pady=(0, 5))
@@ -389,15 +428,6 @@ class EditForm(tk.Toplevel):
 
     def submit_form(self):
         # Handle form submission with validation
-        try:
-            amount = float(self.amount_entry.get())
-            if amount <= 0:
-                tk.messagebox.showerror("Error", "Amount must be greater than 0.")
-                return
-        except ValueError:
-            tk.messagebox.showerror("Error", "Please enter a valid amount.")
-            return
-
         type_val = self.type_var.get()
         category = self.category_var.get()
         if category == "Other":
@@ -406,20 +436,16 @@ class EditForm(tk.Toplevel):
                 tk.messagebox.showerror("Error", "Please specify the 'Other' category.")
                 return
 
-        date = self.date_entry.get()
+        # Stored as ISO-8601 (YYYY-MM-DD); the widget shows mm-dd-yyyy
+        date = self.date_entry.get_date().isoformat()
         note = self.note_entry.get()
-        
-        if not category or not type_val:
-            tk.messagebox.showerror("Error", "Please fill in all required fields.")
+
+        # Same rules as the CSV importer
+        try:
+            self.result = validate_entry(type_val, self.amount_entry.get(), category, date, note)
+        except ValueError as e:
+            tk.messagebox.showerror("Error", str(e))
             return
-        
-        self.result = {
-            "type": type_val,
-            "amount": amount,
-            "category": category,
-            "date": date,
-            "note": note
-        }
         self.destroy()
 
     def cancel_form(self):
@@ -439,12 +465,12 @@ class EditForm(tk.Toplevel):
         """Pre-fill form fields with existing entry data."""
         if self.entry_data:
             self.type_var.set(self.entry_data[2])  # type
-            self.amount_entry.insert(0, str(self.entry_data[4]))  # amount
+            self.amount_entry.insert(0, cents_to_str(self.entry_data[4]))  # amount
             self.category_var.set(self.entry_data[3])  # category
             
             # Set the date in the DateEntry widget
             try:
-                date_obj = datetime.strptime(self.entry_data[1], '%m-%d-%Y').date()
+                date_obj = datetime.strptime(self.entry_data[1], '%Y-%m-%d').date()
                 self.date_entry.set_date(date_obj)
             except ValueError:
                 # If date format is different, try other formats or set to today
@@ -453,8 +479,8 @@ class EditForm(tk.Toplevel):
             if self.entry_data[5]:  # note (might be None)
                 self.note_entry.insert(0, self.entry_data[5])
             
-            # Handle "Other" category
-            if self.entry_data[3] not in ["Food", "Transport", "Utilities", "Entertainment"]:
+            # Categories missing from the dropdown are edited as "Other"
+            if self.entry_data[3] not in self.choices:
                 self.category_var.set("Other")
                 self.other_entry.insert(0, self.entry_data[3])
                 self.check_if_other_category("Other")
@@ -1,5 +1,6 @@
 import tkinter as tk
 from styles import AppStyles
+from money import format_cents
 
 # UI Component for displaying main information at the top of the window
 # App Title on Left
@@ -62,10 +63,14 @@ class InfoTop(tk.Frame):
     def update_balance(self, new_balance):
         # Color code the balance
         color = AppStyles.INCOME_COLOR if new_balance >= 0 else AppStyles.SUCCESS_COLOR
-        self.balance_label.config(text=f"${new_balance:.2f}", fg=color)
+        self.balance_label.config(text=format_cents(new_balance), fg=color)
 
-    def set_filter_status(self, is_filtered):
-        if is_filtered:
+    def set_filter_status(self, is_filtered, shown=None, total=None):
+        """Show whether a filter is on, and how many matches the table lists when not all of them."""
+        if is_filtered and shown is not None and shown < total:
+            # Search results are capped; the balance still covers every match
+            self.filter_status_label.config(text=f"🔍 Filtered View Active · showing {shown:,} of {total:,} matches")
+        elif is_filtered:
             self.filter_status_label.config(text="🔍 Filtered View Active")
         else:
             self.filter_status_label.config(text="")
\ No newline at end of file
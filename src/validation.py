@@ -0,0 +1,44 @@
+from db_helper import to_iso_date
+from money import cents_to_str, parse_cents
+
+ENTRY_TYPES = ("Income", "Expense")
+# Far below SQLite's 64-bit limit, so millions of entries can still be summed
+MAX_AMOUNT_CENTS = 10 ** 12 - 1
+
+
+def validate_entry(type_val, amount, category, date, note=""):
+    """Validate raw entry fields and return the entry dict used by ExpenseDBHelper.
+
+    Shared by AddForm/EditForm and the CSV importer so both accept exactly
+    the same data. The amount is returned in integer cents. Raises
+    ValueError with a user-facing message.
+    """
+    try:
+        amount = parse_cents(amount)
+    except (TypeError, ValueError):
+        raise ValueError("Please enter a valid amount.")
+    if amount <= 0:
+        raise ValueError("Amount must be greater than 0.")
+    if amount > MAX_AMOUNT_CENTS:
+        raise ValueError(f"Amount must be at most {cents_to_str(MAX_AMOUNT_CENTS)}.")
+
+    category = (category or "").strip()
+    if not category or not type_val:
+        raise ValueError("Please fill in all required fields.")
+    if type_val not in ENTRY_TYPES:
+        raise ValueError(f"Type must be one of: {', '.join(ENTRY_TYPES)}.")
+
+    try:
+        date = to_iso_date(date)
+    except (TypeError, ValueError):
+        raise ValueError("Please enter a valid date (mm-dd-yyyy or YYYY-MM-DD).")
+    if not date:
+        raise ValueError("Please fill in all required fields.")
+
+    return {
+        "type": type_val,
+        "amount": amount,
+        "category": category,
+        "date": date,
+        "note": note or ""
+    }
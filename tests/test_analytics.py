@@ -0,0 +1,42 @@
+"""EntryColumns aggregates checked against a handful of known entries."""
+import numpy as np
+import pytest
+
+from analytics import EntryColumns
+from db_helper import ExpenseDBHelper
+
+ENTRIES = [
+    ("2024-01-01", "Income", "Salary", 100000),
+    ("2024-01-01", "Expense", "Food", 3000),
+    ("2024-01-02", "Expense", "Rent", 50000),
+    ("2024-01-04", "Expense", "Food", 1000),
+    ("2024-01-04", "Income", "Gift", 2000),
+]
+
+
+@pytest.fixture
+def columns(tmp_path):
+    with ExpenseDBHelper(str(tmp_path / "analytics.db")) as db:
+        for day, entry_type, category, cents in ENTRIES:
+            db.add_entry({"date": day, "type": entry_type, "category": category, "amount": cents, "note": ""})
+        yield EntryColumns(db).refresh()
+
+
+def test_rolling_average_defaults_to_expenses(columns):
+    days, average = columns.rolling_average(window=2)
+    assert days[0] == np.datetime64("2024-01-01")
+    # Expenses per day 3000, 50000, 0, 1000
+    assert average.tolist() == [3000, 26500, 25000, 500]
+
+
+def test_rolling_average_all_types_is_net(columns):
+    days, average = columns.rolling_average(window=1, entry_type="All")
+    assert average.tolist() == [97000, -50000, 0, 1000]
+
+
+def test_cumulative_balance_carries_earlier_entries(columns):
+    days, balance = columns.cumulative_balance()
+    assert balance.tolist() == [97000, 47000, 47000, 48000]
+    days, balance = columns.cumulative_balance(from_date="2024-01-02")
+    assert days[0] == np.datetime64("2024-01-02")
+    assert balance.tolist() == [47000, 47000, 48000]
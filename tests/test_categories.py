@@ -0,0 +1,44 @@
+"""The in-memory category list and the categories table it mirrors."""
+import sqlite3
+
+import pytest
+
+from db_helper import ExpenseDBHelper
+
+
+def entry(category, amount=500):
+    return {"date": "2024-01-01", "type": "Expense", "category": category, "amount": amount, "note": ""}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "categories.db")
+
+
+def test_failed_write_does_not_keep_new_category(path):
+    with ExpenseDBHelper(path) as db:
+        db.add_entry(entry("Food"))
+        # Not a sqlite3.Error: the INSERT of the new category is rolled back with the entry
+        with pytest.raises(OverflowError):
+            db.add_entry(entry("Books", amount=10 ** 20))
+        entry_id = db.add_entry(entry("Books"))
+        assert db.get_entry_by_id(entry_id)[3] == "Books"
+        assert db.get_all_categories() == ["Books", "Food"]
+    with ExpenseDBHelper(path) as db:
+        assert db.get_all_categories() == ["Books", "Food"]
+
+
+def test_failed_bulk_write_does_not_keep_new_category(path):
+    with ExpenseDBHelper(path) as db:
+        with pytest.raises(OverflowError):
+            db.add_entries_bulk([entry("Books"), entry("Games", amount=10 ** 20)])
+        db.update_entry(db.add_entry(entry("Food")), entry("Games"))
+        assert db.get_all_categories() == ["Games"]
+
+
+def test_category_id_must_exist(path):
+    with ExpenseDBHelper(path) as db:
+        with pytest.raises(sqlite3.IntegrityError):
+            with db.conn:
+                db.conn.execute("INSERT INTO entries (date, type, category_id, amount) "
+                                "VALUES ('2024-01-01', 'Expense', 999, 100)")
@@ -0,0 +1,72 @@
+"""CSV import: validation, dedup on re-import and resuming."""
+import pytest
+
+from csv_io import import_entries
+from db_helper import ExpenseDBHelper
+
+
+@pytest.fixture
+def db(tmp_path):
+    with ExpenseDBHelper(str(tmp_path / "import.db")) as helper:
+        yield helper
+
+
+def write_csv(path, rows):
+    path.write_text("Date,Type,Category,Amount,Note\n" + "".join(",".join(row) + "\n" for row in rows),
+                    encoding="utf-8")
+    return str(path)
+
+
+def test_oversized_amount_is_counted_invalid(db, tmp_path):
+    path = write_csv(tmp_path / "big.csv", [
+        ("2024-01-01", "Expense", "Food", "12.50", ""),
+        ("2024-01-02", "Expense", "Food", "1e20", ""),
+        ("2024-01-03", "Income", "Salary", "99999999999999999999", ""),
+        ("2024-01-04", "Expense", "Rent", "800", ""),
+    ])
+    result = import_entries(db, path)
+    assert (result.imported, result.invalid) == (2, 2)
+    assert [line for line, message in result.errors] == [3, 4]
+    assert db.get_totals()[3] == 2
+
+
+def test_reimport_inserts_nothing(db, tmp_path):
+    path = write_csv(tmp_path / "entries.csv", [
+        ("2024-01-01", "Expense", "Food", "3.50", "coffee"),
+        ("2024-01-01", "Expense", "Food", "3.50", "coffee"),  # a second, identical coffee
+        ("01-02-2024", "Income", "Salary", "2500", ""),
+        ("2024-01-03", "Expense", "food", "12", "lunch"),
+    ])
+    first = import_entries(db, path, batch_size=2)
+    assert (first.imported, first.duplicates, first.invalid) == (4, 0, 0)
+    totals = db.get_totals()
+
+    again = import_entries(db, path, batch_size=2)
+    assert (again.imported, again.duplicates) == (0, 4)
+    assert db.get_totals() == totals
+    assert db.verify_totals(repair=False)
+
+
+
+def test_import_resumes_after_interruption(db, tmp_path, monkeypatch):
+    path = write_csv(tmp_path / "resume.csv",
+                     [(f"2024-01-{day:02d}", "Expense", "Food", str(day), "") for day in range(1, 7)])
+    add_bulk = db.add_entries_bulk
+    calls = []
+
+    def interrupted(entries, checkpoint=None):
+        calls.append(len(entries))
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        return add_bulk(entries, checkpoint=checkpoint)
+
+    monkeypatch.setattr(db, "add_entries_bulk", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        import_entries(db, path, batch_size=2)
+    monkeypatch.undo()
+    assert db.get_totals()[3] == 2
+
+    result = import_entries(db, path, batch_size=2)
+    assert (result.resumed_from, result.imported, result.duplicates) == (3, 6, 0)
+    assert db.get_totals()[3] == 6
+    assert db.get_import_checkpoint(path) is None
@@ -0,0 +1,111 @@
+"""Schema migrations and the trigger-maintained summary tables."""
+import random
+import sqlite3
+
+import pytest
+
+from db_helper import MIGRATIONS, ExpenseDBHelper
+
+# The schema and data format of the first release: mm-dd-yyyy dates, REAL
+# amounts and free-text categories in any case
+BASELINE_SCHEMA = '''
+    CREATE TABLE entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        date TEXT NOT NULL,
+        type TEXT NOT NULL,
+        category TEXT NOT NULL,
+        amount REAL NOT NULL,
+        note TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+BASELINE_ROWS = [
+    ("01-15-2024", "Expense", "food", 12.34, "lunch"),
+    ("01-20-2024", "Expense", "Food", 0.1, None),
+    ("02-01-2024", "Income", "Salary", 2500.0, "pay"),
+    ("02-03-2024", "Expense", "travel", 99.99, "train"),
+    ("02-04-2024", "Expense", "Travel", 19.95, ""),
+    ("02-05-2024", "Expense", "Travel", 5.5, ""),
+    ("03-01-2024", "Expense", "Gym", 30, ""),
+]
+
+ROLLUP_QUERY = '''
+    SELECT month, category_id, type, total, count, min_amount, max_amount
+    FROM monthly_rollup ORDER BY month, category_id, type
+'''
+ROLLUP_RECOUNT = '''
+    SELECT substr(date, 1, 7), category_id, type, SUM(amount), COUNT(*), MIN(amount), MAX(amount)
+    FROM entries GROUP BY 1, 2, 3 ORDER BY 1, 2, 3
+'''
+
+
+@pytest.fixture
+def baseline_path(tmp_path):
+    path = str(tmp_path / "baseline.db")
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(BASELINE_SCHEMA)
+        conn.executemany('INSERT INTO entries (date, type, category, amount, note) VALUES (?, ?, ?, ?, ?)',
+                         BASELINE_ROWS)
+        # The highest id was used and deleted; migrations must not hand it out again
+        conn.execute('DELETE FROM entries WHERE id = 7')
+    conn.close()
+    return path
+
+
+def test_migrate_baseline_database(baseline_path):
+    with ExpenseDBHelper(baseline_path) as db:
+        assert db.conn.execute('PRAGMA user_version').fetchone()[0] == len(MIGRATIONS)
+        rows = sorted(row[:6] for row in db.get_all_entries())
+        assert rows == [
+            (1, "2024-01-15", "Expense", "Food", 1234, "lunch"),
+            (2, "2024-01-20", "Expense", "Food", 10, None),
+            (3, "2024-02-01", "Income", "Salary", 250000, "pay"),
+            (4, "2024-02-03", "Expense", "Travel", 9999, "train"),
+            (5, "2024-02-04", "Expense", "Travel", 1995, ""),
+            (6, "2024-02-05", "Expense", "Travel", 550, ""),
+        ]
+        assert db.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'entries'").fetchone() == (7,)
+        assert db.verify_totals(repair=False)
+        assert db.get_totals() == (250000, 13788, 236212, 6)
+        assert db.conn.execute(ROLLUP_QUERY).fetchall() == db.conn.execute(ROLLUP_RECOUNT).fetchall()
+        assert db.get_all_categories() == ["Food", "Salary", "Travel"]
+        if db.full_text_search:
+            assert [row[0] for row in db.get_filtered_entries(search="train")] == [4]
+
+        new_id = db.add_entry({"date": "2024-03-02", "type": "Expense", "category": "travel", "amount": 100,
+                               "note": ""})
+        assert new_id == 8
+        assert db.get_entry_by_id(new_id)[3] == "Travel"
+
+
+def test_migrating_twice_changes_nothing(baseline_path):
+    with ExpenseDBHelper(baseline_path) as db:
+        before = db.get_all_entries()
+    with ExpenseDBHelper(baseline_path) as db:
+        assert db.get_all_entries() == before
+
+
+def test_summaries_follow_random_writes(tmp_path):
+    rng = random.Random(7)
+    categories = ["Food", "food", "Rent", "Travel", "Gifts"]
+    with ExpenseDBHelper(str(tmp_path / "writes.db")) as db:
+        ids = []
+
+        def random_entry():
+            return {"date": f"2024-{rng.randint(1, 4):02d}-{rng.randint(1, 28):02d}",
+                    "type": rng.choice(["Income", "Expense"]), "category": rng.choice(categories),
+                    "amount": rng.randint(1, 50000), "note": rng.choice(["", "coffee", "rent"])}
+
+        for _ in range(400):
+            action = rng.random()
+            if action < 0.5 or not ids:
+                ids.append(db.add_entry(random_entry()))
+            elif action < 0.8:
+                db.update_entry(rng.choice(ids), random_entry())
+            else:
+                db.delete_entry(ids.pop(rng.randrange(len(ids))))
+
+        assert db.conn.execute(ROLLUP_QUERY).fetchall() == db.conn.execute(ROLLUP_RECOUNT).fetchall()
+        assert db.verify_totals(repair=False)
+        assert db.get_totals()[3] == len(ids)
@@ -0,0 +1,35 @@
+"""Check that the filtered entry queries use the indexes on a realistic database."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from datagen import build_database
+from db_helper import ExpenseDBHelper, is_full_scan
+
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("plans") / "entries.db")
+    build_database(path, 5000, seed=42)
+    with ExpenseDBHelper(path) as helper:
+        helper.conn.execute("ANALYZE")
+        yield helper
+
+
+def test_filtered_queries_use_indexes(db):
+    assert db.check_query_plans() == []
+
+
+@pytest.mark.parametrize("detail, expected", [
+    ("SCAN entries", True),
+    ("SCAN TABLE entries", True),
+    ("SCAN entries USING COVERING INDEX idx_entries_date", False),
+    ("SCAN TABLE entries USING INDEX idx_entries_date", False),
+    ("SEARCH entries USING INDEX idx_entries_date (date>?)", False),
+    ("SCAN entries_fts VIRTUAL TABLE INDEX 0:M2", False),
+])
+def test_is_full_scan(detail, expected):
+    assert is_full_scan(detail) is expected
@@ -0,0 +1,29 @@
+"""In-memory narrowing (entry_matcher) must agree with the FTS5 search it stands in for."""
+import pytest
+
+from db_helper import ExpenseDBHelper, entry_matcher
+
+NOTES = ["Straße", "ﬁle cabinet", "file folder", "Café crème", "ÉCOLE fees", "ΣΊΣΥΦΟΣ", "ｆｕｌｌ width",
+         "x² tutor", "e-mail plan", "naïve_test", "Øre", "Ångström", "ệ phở", "coffee", "COFFEE beans", ""]
+CATEGORIES = ["Food", "Books", "Straßenbahn", "Café"]
+SEARCHES = ["strasse", "straße", "STRASSE", "file", "ﬁle", "cafe", "café", "creme", "ecole", "σίσυφοσ", "σισυφος",
+            "full", "ｆｕｌｌ", "x2", "x²", "e-m", "e mail", "naive test", "ore", "øre", "angstrom", "e pho", "coff",
+            "coffee bea", "food", "books cab", "str"]
+
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    with ExpenseDBHelper(str(tmp_path_factory.mktemp("search") / "search.db")) as helper:
+        if not helper.full_text_search:
+            pytest.skip("SQLite built without FTS5")
+        for i, note in enumerate(NOTES):
+            helper.add_entry({"date": "2024-01-01", "type": "Expense", "category": CATEGORIES[i % len(CATEGORIES)],
+                              "amount": 100 + i, "note": note})
+        yield helper
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+def test_entry_matcher_agrees_with_fts(db, search):
+    matches = entry_matcher(search=search)
+    in_memory = sorted(entry[0] for entry in db.get_all_entries() if matches(entry))
+    assert in_memory == sorted(entry[0] for entry in db.get_filtered_entries(search=search))
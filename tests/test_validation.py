@@ -0,0 +1,26 @@
+"""validate_entry, shared by the entry forms and the CSV importer."""
+import pytest
+
+from validation import MAX_AMOUNT_CENTS, validate_entry
+
+
+def test_amount_in_cents():
+    entry = validate_entry("Expense", "12.5", " Food ", "01-31-2024", None)
+    assert entry == {"type": "Expense", "amount": 1250, "category": "Food", "date": "2024-01-31", "note": ""}
+
+
+def test_largest_amount_accepted():
+    assert validate_entry("Income", "9999999999.99", "Salary", "2024-01-31")["amount"] == MAX_AMOUNT_CENTS
+
+
+@pytest.mark.parametrize("amount", ["10000000000", "1e20", "99999999999999999999", "1e999999999", 10 ** 30, 1e300])
+def test_amount_too_large(amount):
+    # Too large for SQLite's 64-bit integers, or for sums of them
+    with pytest.raises(ValueError):
+        validate_entry("Expense", amount, "Food", "2024-01-31")
+
+
+@pytest.mark.parametrize("amount", ["", "abc", "nan", "inf", "0", "-5"])
+def test_amount_invalid(amount):
+    with pytest.raises(ValueError):
+        validate_entry("Expense", amount, "Food", "2024-01-31")